@@ -6,181 +6,304 @@ Part C Task 2 - handling different file formats and encodings
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import argparse
 import os
-
-datasets = {}
-problems = []
-
-print("\n--- Task 2: CSV and Excel Processing ---\n")
-
-# 1. Sales data
-print("Reading sales_data.csv...")
-sales = pd.read_csv('data/csv/sales_data.csv')
-print(f"got {len(sales)} sales records")
-
-# check for problems
-print(f"columns: {list(sales.columns)}")
-nulls = sales.isnull().sum()
-if nulls.sum() > 0:
-    print("found some null values:")
-    print(nulls[nulls > 0])
-    problems.append("sales has nulls")
-
-# fix negative quantities
-bad_qty = sales[sales['quantity'] < 0]
-if len(bad_qty) > 0:
-    print(f"fixing {len(bad_qty)} negative quantities...")
-    sales['quantity'] = sales['quantity'].abs()  
-
-# handle missing customer names
-sales['customer_name'] = sales['customer_name'].fillna('Unknown')
-sales['status'] = sales['status'].replace('', 'Pending') 
-
-datasets['sales'] = sales
-print("done with sales\n")
-
-# 2. Employee data 
-print("Reading employee_data.csv...")
-try:
-    emp = pd.read_csv('data/csv/employee_data.csv', encoding='utf-8')
-except:
-    print("utf-8 didn't work, trying latin-1...")
-    emp = pd.read_csv('data/csv/employee_data.csv', encoding='latin-1')
-
-print(f"got {len(emp)} employees")
-print(f"departments: {emp['department'].unique()}")
-
-# some stats
-print(f"salary range: {emp['salary'].min()} to {emp['salary'].max()}")
-avg_sal = emp['salary'].mean()
-print(f"average: ${avg_sal:,.0f}")
-
-datasets['employees'] = emp
-print("done with employees\n")
-
-# 3. Customer feedback
-print("Reading customer_feedback.csv...")
-feedback = pd.read_csv('data/csv/customer_feedback.csv')
-print(f"got {len(feedback)} feedback entries")
-
-# rating breakdown
-print("\nratings:")
-print(feedback['rating'].value_counts().sort_index())
-
-# handle missing comments
-feedback['comment'] = feedback['comment'].fillna('no comment')
-feedback['comment'] = feedback['comment'].replace('', 'no comment')
-
-datasets['feedback'] = feedback
-print("done with feedback\n")
-
-# 4. International data - uses semicolon instead of comma
-print("Reading international_data.csv...")
-intl = pd.read_csv('data/csv/international_data.csv', sep=';')  
-print(f"got {len(intl)} records")
-print(f"countries: {list(intl['country'].unique())}")
-
-# quick analysis by country
-country_avg = intl.groupby('country')['gdp'].mean()
-print("\naverage gdp by country:")
-print(country_avg)
-
-datasets['international'] = intl
-print("done with international\n")
-
-# 5. Excel file with multiple sheets
-print("Reading multi_sheet_data.xlsx...")
-xl_file = pd.ExcelFile('data/csv/multi_sheet_data.xlsx')
-print(f"sheets found: {xl_file.sheet_names}")
-
-# read all sheets
-for sheet_name in xl_file.sheet_names:
-    sheet_df = pd.read_excel(xl_file, sheet_name=sheet_name)
-    print(f"  {sheet_name}: {len(sheet_df)} rows")
-    datasets[sheet_name] = sheet_df
-    
-    # do some quick checks
-    if sheet_name == 'Inventory':
-        # check which products are low on stock
-        low = sheet_df[sheet_df['stock'] < sheet_df['reorder_level']]
-        if len(low) > 0:
-            print(f"    warning: {len(low)} products need reordering")
-    
-    elif sheet_name == 'Monthly_Sales':
-        total = sheet_df['total_revenue'].sum()
-        print(f"    total revenue: ${total:,}")
-
-print("done with excel\n")
-
-# data quality summary
-print("\n--- Data Quality Check ---")
-for name, df in datasets.items():
-    nulls = df.isnull().sum().sum()
-    dups = df.duplicated().sum()
-    print(f"{name}: {len(df)} rows, {nulls} nulls, {dups} duplicates")
-
-
-print("\n--- Combining Data ---")
-# merging sales with feedback ratings by product
-if 'sales' in datasets and 'feedback' in datasets:
-    print("merging sales and feedback...")
-    
-    # get average rating per product
-    ratings = feedback.groupby('product')['rating'].agg(['mean', 'count'])
-    ratings.columns = ['avg_rating', 'num_reviews']
-    ratings = ratings.reset_index()
-    
-    # merge into sales
-    sales_merged = sales.merge(ratings, on='product', how='left')
-    print(f"merged dataset has {len(sales_merged)} rows")
-    
-    # saving it
-    sales_merged.to_csv('outputs/sales_with_ratings.csv', index=False)
-    datasets['merged_sales'] = sales_merged
-    print("saved to outputs/sales_with_ratings.csv")
-
-# save all cleaned datasets
-print("\n--- Saving Cleaned Data ---")
-for name, df in datasets.items():
-    if name not in ['merged_sales']:
-        filename = f'outputs/{name}_clean.csv'
-        df.to_csv(filename, index=False)
-        print(f"saved {filename}")
-
-# make a summary report
-summary = []
-for name, df in datasets.items():
-    summary.append({
-        'dataset': name,
-        'rows': len(df),
-        'cols': len(df.columns),
-        'nulls': df.isnull().sum().sum()
-    })
-
-summary_df = pd.DataFrame(summary)
-summary_df.to_csv('outputs/csv_processing_summary.csv', index=False)
-print("\nsaved summary to csv_processing_summary.csv")
-
-# write a report file
-report_text = f"""CSV and Excel Processing Report
+from datastore import DatasetWriter, load_profile, save_dataset
+from csv_sniffer import read_csv_sniffed
+from excel_reader import read_sheets
+from schemas import apply_schema, read_options
+from profiler import profile_dataframe
+from incremental import CsvWatermark, RatingAggregate
+
+
+def clean_sales(df):
+    """fix negative quantities, missing names and empty status - works on a whole frame or one chunk"""
+    df['quantity'] = df['quantity'].abs()
+    df['customer_name'] = df['customer_name'].fillna('Unknown')
+    df['status'] = df['status'].replace('', 'Pending')
+    return df
+
+
+def stream_sales(chunks, ratings, export_csv, append=False, totals=None):
+    """
+    clean, enrich and write sales chunks one at a time (append=True adds them to the saved datasets)
+    totals are running counts for the report - rows, negative quantities, raw nulls per column
+    and the highest order_id / date seen - and are returned together with the two profiles
+    """
+    totals = totals or {'rows': 0, 'negative_qty': 0, 'raw_nulls': {}, 'max_order_id': None, 'max_date': None}
+    clean_writer = DatasetWriter('sales_clean', export_csv=export_csv, append=append, chunked=True)
+    merged_writer = DatasetWriter('sales_with_ratings', export_csv=export_csv, append=append, chunked=True)
+    for chunk in chunks:
+        for col, n in chunk.isnull().sum().items():
+            totals['raw_nulls'][col] = totals['raw_nulls'].get(col, 0) + int(n)
+        totals['negative_qty'] += int((chunk['quantity'] < 0).sum())
+        totals['rows'] += len(chunk)
+        for key, col in [('max_order_id', 'order_id'), ('max_date', 'date')]:
+            values = chunk[col].dropna()
+            if len(values) > 0:
+                top = str(values.max())
+                totals[key] = top if totals[key] is None else max(totals[key], top)
+
+        chunk = clean_sales(chunk)
+        merged = ratings.enrich(chunk)
+
+        # the writers profile each chunk as it goes past (nulls, distinct values, min/max)
+        clean_writer.write(chunk)
+        merged_writer.write(merged)
+    clean_writer.close()
+    merged_writer.close()
+
+    # nothing written (no new rows) - the saved profiles are still the current ones
+    clean_profile = clean_writer.profile or load_profile('sales_clean')
+    merged_profile = merged_writer.profile or load_profile('sales_with_ratings')
+    return totals, clean_profile, merged_profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV and Excel processing (Part C Task 2)')
+    parser.add_argument('--stream', action='store_true',
+                        help='read sales_data.csv in chunks instead of loading it all at once')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only process sales rows appended since the last run and add them to the saved outputs')
+    parser.add_argument('--reset-watermark', action='store_true',
+                        help='forget how far sales_data.csv was processed (with --incremental: start from the top)')
+    parser.add_argument('--chunksize', type=int, default=100000,
+                        help='rows per chunk in --stream / --incremental mode (default 100000)')
+    parser.add_argument('--no-csv', dest='export_csv', action='store_false',
+                        help='only write the columnar outputs, skip the csv copies')
+    parser.add_argument('--excel-workers', type=int, default=None,
+                        help='processes used to parse excel sheets (default: one per sheet, up to cpu count)')
+    parser.add_argument('--no-excel-cache', dest='excel_cache', action='store_false',
+                        help='always re-parse the workbook instead of using the cached sheets')
+    parser.add_argument('--rebuild-ratings', action='store_true',
+                        help='throw away the saved product rating aggregate and rebuild it from all feedback')
+    args = parser.parse_args()
+
+    datasets = {}
+    profiles = {}  # row/null/duplicate stats of every dataset (streamed ones only have these), also saved next to the data
+    problems = []
+
+    # rating sum/count per product, kept between runs in outputs/state/ so only new feedback is aggregated
+    ratings = RatingAggregate(rebuild=args.rebuild_ratings)
+
+    print("\n--- Task 2: CSV and Excel Processing ---\n")
+
+    # 1. Sales data
+    if args.stream or args.incremental:
+        # sales extracts can be far bigger than memory, so clean and write one chunk at a time
+        # and only keep running totals for the report
+
+        # bring the rating aggregate up to date first so every chunk can be enriched on the way out
+        rating_cols = ['feedback_id', 'product', 'rating']
+        ratings.update(read_csv_sniffed('data/csv/customer_feedback.csv', usecols=rating_cols,
+                                        **read_options('feedback', rating_cols)))
+
+        if args.incremental:
+            # the watermark remembers the byte offset the last run stopped at, so only
+            # appended rows are read and the outputs/totals are extended instead of rebuilt
+            # (rows already saved keep the ratings they were enriched with back then)
+            watermark = CsvWatermark('sales_watermark', 'data/csv/sales_data.csv', reset=args.reset_watermark)
+            if watermark.offset == 0:
+                print("Reading sales_data.csv from the start (no watermark yet)...")
+            else:
+                print(f"Reading sales_data.csv from byte {watermark.offset:,} "
+                      f"(up to order {watermark.totals.get('max_order_id')})...")
+            rows_before = watermark.totals.get('rows', 0)
+            totals, clean_profile, merged_profile = stream_sales(
+                watermark.new_rows(args.chunksize, **read_options('sales')), ratings, args.export_csv,
+                append=watermark.offset > 0, totals=watermark.totals or None)
+            watermark.totals = totals
+            watermark.commit()
+            print(f"{totals['rows'] - rows_before} new sales records, {totals['rows']} in total")
+        else:
+            print(f"Streaming sales_data.csv in chunks of {args.chunksize:,} rows...")
+            totals, clean_profile, merged_profile = stream_sales(
+                read_csv_sniffed('data/csv/sales_data.csv', verbose=True, chunksize=args.chunksize,
+                                 **read_options('sales')),
+                ratings, args.export_csv)
+            print(f"got {totals['rows']} sales records")
+
+        raw_nulls = pd.Series(totals['raw_nulls'], dtype=int)
+        if raw_nulls.sum() > 0:
+            print("found some null values:")
+            print(raw_nulls[raw_nulls > 0])
+            problems.append("sales has nulls")
+        if totals['negative_qty'] > 0:
+            print(f"fixed {totals['negative_qty']} negative quantities")
+
+        if clean_profile is not None:
+            profiles['sales'] = clean_profile
+            profiles['merged_sales'] = merged_profile
+        print("saved sales_clean and sales_with_ratings")
+        print("done with sales\n")
+    else:
+        print("Reading sales_data.csv...")
+        sales = read_csv_sniffed('data/csv/sales_data.csv', verbose=True, **read_options('sales'))
+        print(f"got {len(sales)} sales records")
+
+        # check for problems
+        print(f"columns: {list(sales.columns)}")
+        nulls = sales.isnull().sum()
+        if nulls.sum() > 0:
+            print("found some null values:")
+            print(nulls[nulls > 0])
+            problems.append("sales has nulls")
+
+        # fix negative quantities, missing customer names, empty status
+        bad_qty = sales[sales['quantity'] < 0]
+        if len(bad_qty) > 0:
+            print(f"fixing {len(bad_qty)} negative quantities...")
+        sales = clean_sales(sales)
+
+        datasets['sales'] = sales
+        print("done with sales\n")
+
+    # 2. Employee data - saved as latin-1, the sniffer picks that up from the first few KB
+    print("Reading employee_data.csv...")
+    emp = read_csv_sniffed('data/csv/employee_data.csv', verbose=True, **read_options('employees'))
+
+    print(f"got {len(emp)} employees")
+    print(f"departments: {emp['department'].unique()}")
+
+    # some stats
+    print(f"salary range: {emp['salary'].min()} to {emp['salary'].max()}")
+    avg_sal = emp['salary'].mean()
+    print(f"average: ${avg_sal:,.0f}")
+
+    datasets['employees'] = emp
+    print("done with employees\n")
+
+    # 3. Customer feedback
+    print("Reading customer_feedback.csv...")
+    feedback = read_csv_sniffed('data/csv/customer_feedback.csv', verbose=True, **read_options('feedback'))
+    print(f"got {len(feedback)} feedback entries")
+
+    # rating breakdown
+    print("\nratings:")
+    print(feedback['rating'].value_counts().sort_index())
+
+    # handle missing comments
+    feedback['comment'] = feedback['comment'].fillna('no comment')
+    feedback['comment'] = feedback['comment'].replace('', 'no comment')
+
+    datasets['feedback'] = feedback
+    print("done with feedback\n")
+
+    # 4. International data - uses semicolon instead of comma (the sniffer finds it)
+    print("Reading international_data.csv...")
+    intl = read_csv_sniffed('data/csv/international_data.csv', verbose=True, **read_options('international'))
+    print(f"got {len(intl)} records")
+    print(f"countries: {list(intl['country'].unique())}")
+
+    # quick analysis by country
+    country_avg = intl.groupby('country', observed=True)['gdp'].mean()
+    print("\naverage gdp by country:")
+    print(country_avg)
+
+    datasets['international'] = intl
+    print("done with international\n")
+
+    # 5. Excel file with multiple sheets
+    # sheets are parsed in parallel (one process each) and cached, so an unchanged
+    # workbook is read straight from outputs/.cache/excel on the next run
+    print("Reading multi_sheet_data.xlsx...")
+    sheets = read_sheets('data/csv/multi_sheet_data.xlsx', max_workers=args.excel_workers,
+                         use_cache=args.excel_cache)
+    print(f"sheets found: {list(sheets)}")
+
+    for sheet_name, sheet_df in sheets.items():
+        print(f"  {sheet_name}: {len(sheet_df)} rows")
+        datasets[sheet_name] = apply_schema(sheet_df, sheet_name)
+
+        # do some quick checks
+        if sheet_name == 'Inventory':
+            # check which products are low on stock
+            low = sheet_df[sheet_df['stock'] < sheet_df['reorder_level']]
+            if len(low) > 0:
+                print(f"    warning: {len(low)} products need reordering")
+
+        elif sheet_name == 'Monthly_Sales':
+            total = sheet_df['total_revenue'].sum()
+            print(f"    total revenue: ${total:,}")
+
+    print("done with excel\n")
+
+    # data quality summary - one profiling pass per dataset, reused when the data is saved
+    print("\n--- Data Quality Check ---")
+    for name, df in datasets.items():
+        profiles[name] = profile_dataframe(df)
+    for name, prof in profiles.items():
+        # duplicates would need every row in memory, so they are not tracked for streamed data
+        dups = 'duplicates not checked (streamed)' if prof['duplicates'] is None else f"{prof['duplicates']} duplicates"
+        print(f"{name}: {prof['rows']} rows, {prof['null_values']} nulls, {dups}")
+
+
+    print("\n--- Combining Data ---")
+    # merging sales with feedback ratings by product
+    new_feedback = ratings.update(feedback)
+    ratings.save()
+    print(f"rating aggregate: {new_feedback} new feedback rows added, {len(ratings.products)} products rated")
+
+    if 'sales' in datasets and 'feedback' in datasets:
+        print("merging sales and feedback...")
+
+        # look the per-product rating up for every sale (no groupby over all feedback, no merge)
+        sales_merged = ratings.enrich(sales)
+        print(f"merged dataset has {len(sales_merged)} rows")
+
+        # saving it
+        profiles['merged_sales'] = save_dataset(sales_merged, 'sales_with_ratings', export_csv=args.export_csv)
+        datasets['merged_sales'] = sales_merged
+        print("saved sales_with_ratings")
+    elif 'merged_sales' in profiles:
+        print("sales and feedback were merged chunk by chunk while streaming")
+
+    # save all cleaned datasets
+    print("\n--- Saving Cleaned Data ---")
+    for name, df in datasets.items():
+        if name not in ['merged_sales']:
+            save_dataset(df, f'{name}_clean', export_csv=args.export_csv, profile=profiles[name])
+            print(f"saved {name}_clean")
+
+    # make a summary report
+    summary = []
+    for name, prof in profiles.items():
+        summary.append({
+            'dataset': name,
+            'rows': prof['rows'],
+            'cols': prof['columns'],
+            'nulls': prof['null_values']
+        })
+
+    summary_df = pd.DataFrame(summary)
+    summary_df.to_csv('outputs/csv_processing_summary.csv', index=False)
+    print("\nsaved summary to csv_processing_summary.csv")
+
+    # write a report file
+    report_text = f"""CSV and Excel Processing Report
 Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
-Files processed: {len(datasets)}
-Total records: {sum([len(d) for d in datasets.values()])}
+Files processed: {len(profiles)}
+Total records: {sum([p['rows'] for p in profiles.values()])}
 
 Problems found:
 """
-for p in problems:
-    report_text += f"- {p}\n"
+    for p in problems:
+        report_text += f"- {p}\n"
 
-report_text += f"""
+    report_text += f"""
 Datasets created:
 """
-for name in datasets.keys():
-    report_text += f"- {name}\n"
+    for name in profiles:
+        report_text += f"- {name}\n"
+
+    with open('outputs/csv_report.txt', 'w') as f:
+        f.write(report_text)
+
+    print("\nAll done! Check outputs folder for results.")
+    print(f"Processed {len(profiles)} datasets successfully.")
 
-with open('outputs/csv_report.txt', 'w') as f:
-    f.write(report_text)
 
-print("\nAll done! Check outputs folder for results.")
-print(f"Processed {len(datasets)} datasets successfully.")
\ No newline at end of file
+# the excel sheets are parsed in worker processes, which re-import this file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+CSV format sniffer
+Reads a small byte sample of a csv file once and works out the encoding, delimiter,
+quoting and whether there is a header, so pd.read_csv only has to go through the file
+one time (no more "try utf-8, read it all again as latin-1").
+"""
+
+import codecs
+import csv
+import os
+import pandas as pd
+
+SAMPLE_BYTES = 64 * 1024
+EXTRA_SAMPLES = 4  # extra blocks checked further into the file when the start is plain ascii
+DELIMITERS = ',;\t|'
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def _classify(block, at_start=True):
+    """'ascii', 'utf-8' or a single byte encoding for one block of bytes"""
+    if not at_start:
+        # a block from the middle of the file can start inside a multi-byte character
+        block = block.lstrip(CONTINUATION_BYTES)
+    if block.isascii():
+        return 'ascii'
+    try:
+        # final=False so a character cut off at the end of the block is not an error
+        codecs.getincrementaldecoder('utf-8')().decode(block, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # 0x80-0x9f are control characters in latin-1 but printable in cp1252 (quotes, euro sign...)
+    if any(0x80 <= b <= 0x9F for b in block):
+        return 'cp1252'
+    return 'latin-1'
+
+
+def detect_encoding(f, sample, sample_bytes=SAMPLE_BYTES):
+    """guess the encoding from the sample (and a few more blocks if the sample is all ascii)"""
+    for bom, name in BOMS:
+        if sample.startswith(bom):
+            return name
+
+    found = _classify(sample)
+    if found != 'ascii':
+        return found
+
+    # the start only had ascii - peek at a few evenly spaced blocks instead of reading everything
+    size = os.fstat(f.fileno()).st_size
+    if size > sample_bytes:
+        step = size // (EXTRA_SAMPLES + 1)
+        for i in range(1, EXTRA_SAMPLES + 1):
+            f.seek(i * step)
+            found = _classify(f.read(sample_bytes // 4), at_start=False)
+            if found != 'ascii':
+                return found
+    return 'utf-8'
+
+
+def sniff_csv(path, sample_bytes=SAMPLE_BYTES):
+    """
+    look at the start of a csv and return the keyword arguments for pd.read_csv
+    (encoding, sep, quotechar, skipinitialspace, header and escapechar if one is used)
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+        encoding = detect_encoding(f, sample, sample_bytes)
+
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=False)
+    # only give the sniffer whole lines
+    if len(sample) == sample_bytes and '\n' in text:
+        text = text[:text.rindex('\n')]
+
+    settings = {'encoding': encoding, 'sep': ',', 'header': 'infer'}
+    if not text.strip():
+        return settings
+
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(text, delimiters=DELIMITERS)
+    except csv.Error:
+        return settings  # one column or not really a csv - pandas defaults will do
+
+    settings.update({
+        'sep': dialect.delimiter,
+        'quotechar': dialect.quotechar,
+        'skipinitialspace': dialect.skipinitialspace,
+    })
+    # the sniffer reports doublequote=False whenever the sample has no quotes at all,
+    # so only switch away from the standard "" escaping when it really saw an escape char
+    if dialect.escapechar:
+        settings.update({'escapechar': dialect.escapechar, 'doublequote': False})
+    try:
+        if not sniffer.has_header(text):
+            settings['header'] = None
+    except csv.Error:
+        pass
+    return settings
+
+
+def read_csv_sniffed(path, verbose=False, **kwargs):
+    """pd.read_csv with the settings sniff_csv found - extra kwargs (chunksize, usecols...) are passed on"""
+    settings = sniff_csv(path)
+    if verbose:
+        sep = {'\t': '\\t'}.get(settings['sep'], settings['sep'])
+        header = 'no header' if settings['header'] is None else 'header'
+        print(f"  detected: encoding={settings['encoding']}, delimiter='{sep}', {header}")
+    settings.update(kwargs)
+    return pd.read_csv(path, **settings)
@@ -0,0 +1,162 @@
+"""
+Columnar storage for the Part C outputs
+Every stage writes its datasets as Arrow IPC (Feather v2) files under outputs/columnar/
+so final_integration.py can read them back with the original dtypes, only the columns
+it needs and without re-parsing text. The old CSV files are still written as an export.
+Each dataset also gets a _profile.json sidecar (row count, nulls, distinct estimates,
+min/max, duplicates) computed while it is written.
+"""
+
+import os
+import glob
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from schemas import apply_schema, read_options
+from profiler import ProfileBuilder
+import jsonio
+
+OUTPUT_DIR = 'outputs'
+STORE_DIR = os.path.join(OUTPUT_DIR, 'columnar')
+
+
+def dataset_dir(name):
+    """folder that holds the part files of a dataset"""
+    return os.path.join(STORE_DIR, name)
+
+
+def dataset_parts(name):
+    """part files of a dataset in the order they were written"""
+    return sorted(glob.glob(os.path.join(dataset_dir(name), 'part-*.feather')))
+
+
+def dataset_exists(name):
+    return len(dataset_parts(name)) > 0
+
+
+def csv_export_path(name):
+    return os.path.join(OUTPUT_DIR, f'{name}.csv')
+
+
+def profile_path(name):
+    return os.path.join(dataset_dir(name), '_profile.json')
+
+
+def load_profile(name):
+    """the sidecar statistics of a dataset, or None if it has none"""
+    path = profile_path(name)
+    if not os.path.exists(path):
+        return None
+    return jsonio.load_file(path)
+
+
+def save_profile(name, profile):
+    jsonio.save_file(profile_path(name), profile)
+
+
+class DatasetWriter:
+    """
+    Writes DataFrames (or chunks of one) to a columnar dataset.
+    Each writer produces one part file; append=True keeps the parts that are
+    already there, otherwise the dataset is replaced.
+    With export_csv the same rows also go to outputs/<name>.csv.
+    Pass chunked=True when writing more than one frame: categorical columns are then
+    stored as plain strings, because an arrow file can only hold one dictionary per
+    column and every chunk has its own categories (load_dataset turns them back).
+    The profile of everything written is saved next to the data on close() - pass
+    profile= if the caller already profiled the frame and it shouldn't be done twice.
+    """
+
+    def __init__(self, name, export_csv=True, append=False, chunked=False, profile=None):
+        self.name = name
+        self.export_csv = export_csv
+        self.chunked = chunked
+        self.rows = 0
+        self.schema = None
+        self.profile = profile
+        self._writer = None
+
+        os.makedirs(dataset_dir(name), exist_ok=True)
+        parts = dataset_parts(name)
+        if not append:
+            for old in parts + glob.glob(profile_path(name)):
+                os.remove(old)
+            parts = []
+        self._profiler = None if profile is not None else ProfileBuilder(load_profile(name) if parts else None)
+        self.path = os.path.join(dataset_dir(name), f'part-{len(parts):05d}.feather')
+        # a fresh dataset starts a fresh csv, an appended one continues it
+        self._csv_header = not (append and os.path.exists(csv_export_path(name)))
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.chunked:
+            table = _decode_dictionaries(table)
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = pa.ipc.new_file(self.path, self.schema)
+        elif not table.schema.equals(self.schema):
+            # later chunks can infer different types (e.g. an all-null column)
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+
+        if self.export_csv:
+            df.to_csv(csv_export_path(self.name), mode='w' if self._csv_header else 'a',
+                      header=self._csv_header, index=False)
+            self._csv_header = False
+        if self._profiler is not None:
+            self._profiler.add(df)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            if self._profiler is not None:
+                self.profile = self._profiler.result()
+            save_profile(self.name, self.profile)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _decode_dictionaries(table):
+    if not any(pa.types.is_dictionary(t) for t in table.schema.types):
+        return table
+    columns = [c.cast(c.type.value_type) if pa.types.is_dictionary(c.type) else c for c in table.columns]
+    return pa.table(columns, names=table.column_names).replace_schema_metadata(table.schema.metadata)
+
+
+def save_dataset(df, name, export_csv=True, profile=None):
+    """replace dataset `name` with df (plus outputs/<name>.csv when export_csv is on), returns its profile"""
+    with DatasetWriter(name, export_csv=export_csv, profile=profile) as writer:
+        writer.write(df)
+    return writer.profile
+
+
+def load_table(name, columns=None):
+    """read a dataset as an Arrow table - files are memory-mapped and only `columns` are read"""
+    tables = [feather.read_table(path, columns=columns, memory_map=True) for path in dataset_parts(name)]
+    if not tables:
+        raise FileNotFoundError(f"no columnar data for {name} in {STORE_DIR}")
+    first = tables[0].schema
+    tables = [t if t.schema.equals(first) else t.cast(first) for t in tables]
+    return pa.concat_tables(tables)
+
+
+def load_dataset(name, columns=None, schema=None):
+    """
+    read a dataset back as a DataFrame, cast to the `schema` entry of the registry if given
+    falls back to outputs/<name>.csv for outputs written before the columnar store existed
+    """
+    if dataset_exists(name):
+        df = load_table(name, columns).to_pandas()
+    else:
+        df = pd.read_csv(csv_export_path(name), usecols=columns, **read_options(schema, columns))
+    return apply_schema(df, schema) if schema else df
+
+
+def output_exists(name):
+    return dataset_exists(name) or os.path.exists(csv_export_path(name))
@@ -0,0 +1,80 @@
+"""
+Multi-sheet Excel reading
+openpyxl is slow on big workbooks, so every sheet is parsed in its own worker process
+and the parsed sheet is cached as a Feather file. The cache key is the workbook's path,
+mtime and size - an unchanged workbook is never parsed again.
+"""
+
+import hashlib
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import jsonio
+
+CACHE_DIR = os.path.join('outputs', '.cache', 'excel')
+
+
+def workbook_key(path):
+    """(path part, version part) of the cache key - version changes whenever the file does"""
+    st = os.stat(path)
+    path_part = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    version_part = hashlib.sha1(f"{st.st_mtime_ns}|{st.st_size}".encode('utf-8')).hexdigest()[:12]
+    return path_part, version_part
+
+
+def _parse_sheet(path, sheet_name, cache_path):
+    """worker: parse one sheet and drop it into the cache, return the frame only if it can't be cached"""
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    # feather needs string column names (excel headers can be numbers)
+    df.columns = [str(c) for c in df.columns]
+    try:
+        df.to_feather(cache_path)
+        return None
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+        # mixed-type columns can't go into arrow - hand the frame back instead of caching it
+        return df
+
+
+def read_sheets(path, max_workers=None, use_cache=True):
+    """
+    read every sheet of a workbook into {sheet_name: DataFrame}, in workbook order
+    sheets missing from the cache are parsed in parallel, one process per sheet
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path_part, version_part = workbook_key(path)
+    prefix = os.path.join(CACHE_DIR, f'{path_part}-{version_part}')
+    manifest_path = f'{prefix}.json'
+
+    if use_cache and os.path.exists(manifest_path):
+        names = jsonio.load_file(manifest_path)['sheets']
+    else:
+        # workbook is new or has changed - throw away whatever was cached for older versions of it
+        for old in glob.glob(os.path.join(CACHE_DIR, f'{path_part}-*')):
+            os.remove(old)
+        with pd.ExcelFile(path) as xl:
+            names = list(xl.sheet_names)
+
+    cache_paths = {name: f'{prefix}-{i:03d}.feather' for i, name in enumerate(names)}
+    todo = [n for n in names if not (use_cache and os.path.exists(cache_paths[n]))]
+
+    uncached = {}
+    if len(todo) > 1 and max_workers != 1:
+        workers = min(len(todo), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {n: pool.submit(_parse_sheet, path, n, cache_paths[n]) for n in todo}
+            for n, fut in futures.items():
+                df = fut.result()
+                if df is not None:
+                    uncached[n] = df
+    else:
+        for n in todo:
+            df = _parse_sheet(path, n, cache_paths[n])
+            if df is not None:
+                uncached[n] = df
+
+    # sheets that could not be cached just get parsed again next time
+    jsonio.save_file(manifest_path, {'workbook': os.path.abspath(path), 'sheets': names})
+
+    return {n: uncached[n] if n in uncached else pd.read_feather(cache_paths[n]) for n in names}
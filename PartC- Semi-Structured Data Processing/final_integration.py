@@ -8,45 +8,58 @@ import pandas as pd
 import os
 from datetime import datetime
 import matplotlib.pyplot as plt
+from datastore import load_dataset, load_profile, output_exists, save_dataset
+from profiler import profile_dataframe
+from schemas import apply_schema
 
 print("\n" + "="*60)
 print("FINAL DATA INTEGRATION - PART C")
 print("="*60 + "\n")
 
-# collect all processed data
+# collect the profiles of all processed data
+# every stage saves a _profile.json sidecar (rows, nulls, duplicates, memory) next to its
+# columnar dataset, so the catalog is built from those without loading the data itself
 all_data = {}
+sources = {}  # catalog name -> (dataset, schema) for the ones we do need to load later
+
+
+def dataset_profile(file, schema):
+    """sidecar profile of a dataset - only outputs written without one get loaded and profiled here"""
+    profile = load_profile(file)
+    if profile is None:
+        profile = profile_dataframe(load_dataset(file, schema=schema))
+    return profile
+
 
 print("Loading processed datasets...\n")
 
 # From JSON processing
-json_files = ['users_processed.csv', 'posts_processed.csv', 'countries_processed.csv']
+json_files = ['users_processed', 'posts_processed', 'countries_processed']
 for file in json_files:
-    path = f'outputs/{file}'
-    if os.path.exists(path):
-        name = file.replace('_processed.csv', '')
-        df = pd.read_csv(path)
-        all_data[f'json_{name}'] = df
-        print(f"✓ Loaded {name} from JSON: {len(df)} records")
+    if output_exists(file):
+        name = file.replace('_processed', '')
+        all_data[f'json_{name}'] = dataset_profile(file, name)
+        sources[f'json_{name}'] = (file, name)
+        print(f"✓ Loaded {name} from JSON: {all_data[f'json_{name}']['rows']} records")
 
 # From CSV/Excel processing
-csv_files = ['sales_clean.csv', 'employees_clean.csv', 'feedback_clean.csv']
+csv_files = ['sales_clean', 'employees_clean', 'feedback_clean']
 for file in csv_files:
-    path = f'outputs/{file}'
-    if os.path.exists(path):
-        name = file.replace('_clean.csv', '')
-        df = pd.read_csv(path)
-        all_data[f'csv_{name}'] = df
-        print(f"✓ Loaded {name} from CSV: {len(df)} records")
+    if output_exists(file):
+        name = file.replace('_clean', '')
+        all_data[f'csv_{name}'] = dataset_profile(file, name)
+        sources[f'csv_{name}'] = (file, name)
+        print(f"✓ Loaded {name} from CSV: {all_data[f'csv_{name}']['rows']} records")
 
 # From XML processing
-xml_files = ['books_from_xml.csv', 'employees_from_xml.csv', 'products_from_xml.csv']
+xml_files = ['books_from_xml', 'employees_from_xml', 'products_from_xml']
 for file in xml_files:
-    path = f'outputs/{file}'
-    if os.path.exists(path):
-        name = file.replace('_from_xml.csv', '')
-        df = pd.read_csv(path)
-        all_data[f'xml_{name}'] = df
-        print(f"✓ Loaded {name} from XML: {len(df)} records")
+    if output_exists(file):
+        name = file.replace('_from_xml', '')
+        schema = 'xml_employees' if name == 'employees' else name
+        all_data[f'xml_{name}'] = dataset_profile(file, schema)
+        sources[f'xml_{name}'] = (file, schema)
+        print(f"✓ Loaded {name} from XML: {all_data[f'xml_{name}']['rows']} records")
 
 print(f"\nTotal datasets loaded: {len(all_data)}")
 
@@ -54,21 +67,23 @@ print(f"\nTotal datasets loaded: {len(all_data)}")
 print("\n--- Creating Master Data Catalog ---")
 catalog = []
 
-for name, df in all_data.items():
+for name, profile in all_data.items():
     source_type = name.split('_')[0]  # json, csv, or xml
     
     info = {
         'dataset_name': name,
         'source_type': source_type.upper(),
-        'records': len(df),
-        'columns': len(df.columns),
-        'memory_kb': round(df.memory_usage(deep=True).sum() / 1024, 2),
-        'null_values': df.isnull().sum().sum(),
-        'duplicates': df.duplicated().sum()
+        'records': profile['rows'],
+        'columns': profile['columns'],
+        'memory_kb': profile['memory_kb'],
+        'null_values': profile['null_values'],
+        # None when the dataset was streamed in chunks (see csv_processing --stream)
+        'duplicates': profile['duplicates']
     }
     catalog.append(info)
 
 catalog_df = pd.DataFrame(catalog)
+catalog_df['duplicates'] = catalog_df['duplicates'].astype('Int64')
 print("\nData Catalog:")
 print(catalog_df.to_string(index=False))
 
@@ -93,7 +108,7 @@ print(f"Data Sources: JSON ({len([d for d in all_data if d.startswith('json')])}
 # data quality summary
 print("\n--- Data Quality Summary ---")
 total_nulls = catalog_df['null_values'].sum()
-total_dups = catalog_df['duplicates'].sum()
+total_dups = int(catalog_df['duplicates'].fillna(0).sum())
 print(f"Total Null Values: {total_nulls}")
 print(f"Total Duplicates: {total_dups}")
 
@@ -103,14 +118,17 @@ print(f"Overall Data Quality Score: {quality_score:.2f}%")
 print("\n--- Example Integration: Employee Data ---")
 emp_datasets = []
 
+# only the four columns used here are read from the columnar files
 if 'csv_employees' in all_data:
-    csv_emp = all_data['csv_employees'][['emp_id', 'name', 'department', 'salary']].copy()
+    file, schema = sources['csv_employees']
+    csv_emp = load_dataset(file, columns=['emp_id', 'name', 'department', 'salary'], schema=schema)
     csv_emp['source'] = 'CSV'
     emp_datasets.append(csv_emp)
     print(f"CSV employees: {len(csv_emp)}")
 
 if 'xml_employees' in all_data:
-    xml_emp = all_data['xml_employees'][['id', 'name', 'department', 'salary']].copy()
+    file, schema = sources['xml_employees']
+    xml_emp = load_dataset(file, columns=['id', 'name', 'department', 'salary'], schema=schema)
     xml_emp.rename(columns={'id': 'emp_id'}, inplace=True)
     xml_emp['source'] = 'XML'
     emp_datasets.append(xml_emp)
@@ -118,14 +136,14 @@ if 'xml_employees' in all_data:
 
 if emp_datasets:
     # combine all employee data
-    combined_emp = pd.concat(emp_datasets, ignore_index=True)
+    combined_emp = apply_schema(pd.concat(emp_datasets, ignore_index=True), 'integrated_employees')
     
     # some stats
     print(f"\nCombined employee dataset: {len(combined_emp)} total employees")
     print(f"Departments: {combined_emp['department'].nunique()}")
     print(f"Salary range: ${combined_emp['salary'].min():,} - ${combined_emp['salary'].max():,}")
     
-    combined_emp.to_csv('outputs/integrated_employees.csv', index=False)
+    save_dataset(combined_emp, 'integrated_employees')
     print("✓ Saved integrated_employees.csv")
 
 # create visualization (simple bar chart)
@@ -179,19 +197,19 @@ DATA SOURCES PROCESSED
 {'-'*60}
 
 1. STRUCTURED DATA (JSON APIs)
-   - JSONPlaceholder Users API: {len(all_data.get('json_users', [])):,} records
-   - JSONPlaceholder Posts API: {len(all_data.get('json_posts', [])):,} records
-   - REST Countries API: {len(all_data.get('json_countries', [])):,} records
+   - JSONPlaceholder Users API: {all_data.get('json_users', {}).get('rows', 0):,} records
+   - JSONPlaceholder Posts API: {all_data.get('json_posts', {}).get('rows', 0):,} records
+   - REST Countries API: {all_data.get('json_countries', {}).get('rows', 0):,} records
    
 2. SEMI-STRUCTURED DATA (CSV/Excel)
-   - Sales Data: {len(all_data.get('csv_sales', [])):,} records
-   - Employee Data: {len(all_data.get('csv_employees', [])):,} records
-   - Customer Feedback: {len(all_data.get('csv_feedback', [])):,} records
+   - Sales Data: {all_data.get('csv_sales', {}).get('rows', 0):,} records
+   - Employee Data: {all_data.get('csv_employees', {}).get('rows', 0):,} records
+   - Customer Feedback: {all_data.get('csv_feedback', {}).get('rows', 0):,} records
    
 3. UNSTRUCTURED DATA (XML)
-   - Books Catalog: {len(all_data.get('xml_books', [])):,} records
-   - Employee Records: {len(all_data.get('xml_employees', [])):,} records
-   - Product Inventory: {len(all_data.get('xml_products', [])):,} records
+   - Books Catalog: {all_data.get('xml_books', {}).get('rows', 0):,} records
+   - Employee Records: {all_data.get('xml_employees', {}).get('rows', 0):,} records
+   - Product Inventory: {all_data.get('xml_products', {}).get('rows', 0):,} records
 
 OVERALL STATISTICS
 {'-'*60}
@@ -1,73 +1,122 @@
 """
 Sample Data Generator for CSV and Excel Processing
 Creates realistic test datasets with various issues to handle
+
+--scale multiplies the row counts (1.0 = the original 500 sales / 200 employees /
+150 feedback / 120 international rows), rows are sampled with numpy a chunk at a time
+and appended to the files, so even 100M rows only need one chunk in memory.
+The same --seed and --chunk-rows always give the same files.
 """
 
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
+import argparse
 import os
 
+parser = argparse.ArgumentParser(description='Generate the Part C sample datasets')
+parser.add_argument('--scale', type=float, default=1.0,
+                    help='row count multiplier (default 1.0 = 500 sales rows)')
+parser.add_argument('--seed', type=int, default=42, help='random seed (default 42)')
+parser.add_argument('--chunk-rows', type=int, default=1000000,
+                    help='rows generated and written at a time (default 1,000,000)')
+args = parser.parse_args()
+
+rng = np.random.default_rng(args.seed)
+EXCEL_MAX_ROWS = 1048575  # one row of the sheet is the header
+
+
+def scaled(rows):
+    return max(1, int(round(rows * args.scale)))
+
+
+def pick(options, n):
+    """n random picks from a list (None and '' are kept as they are)"""
+    return np.array(options, dtype=object)[rng.integers(0, len(options), n)]
+
+
+def padded_ids(prefix, start, n, width):
+    """prefix + zero padded running number, e.g. ORD0001"""
+    return prefix + pd.Series(np.arange(start + 1, start + n + 1)).astype(str).str.zfill(width)
+
+
+def days_ago(low, high, n):
+    """dates between low and high days before today, as yyyy-mm-dd strings"""
+    today = np.datetime64(datetime.now().date())
+    return np.datetime_as_string(today - rng.integers(low, high + 1, n).astype('timedelta64[D]'))
+
+
+def write_in_chunks(path, total, make_chunk, **to_csv_args):
+    """build the file `chunk_rows` rows at a time, make_chunk(start, n) returns one DataFrame"""
+    for start in range(0, total, args.chunk_rows):
+        chunk = make_chunk(start, min(args.chunk_rows, total - start))
+        chunk.to_csv(path, index=False, mode='w' if start == 0 else 'a', header=start == 0, **to_csv_args)
+    return total
+
 
 os.makedirs('data/csv', exist_ok=True)
 
-print("Generating sample datasets...")
+print(f"Generating sample datasets (scale {args.scale:g}, seed {args.seed})...")
 
 # Dataset 1: Sales data with missing values and encoding issues
 print("\n1. Creating sales_data.csv...")
-dates = pd.date_range(start='2023-01-01', end='2024-12-31', freq='D')
+dates = np.datetime_as_string(np.arange('2023-01-01', '2025-01-01', dtype='datetime64[D]'))
 products = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Webcam']
 regions = ['North', 'South', 'East', 'West']
-sales_data = []
-
-for i in range(500):
-    sale = {
-        'order_id': f'ORD{i+1:04d}',
-        'date': random.choice(dates).strftime('%Y-%m-%d'),
-        'product': random.choice(products),
-        'quantity': random.randint(1, 10),
-        'price': round(random.uniform(10, 1000), 2),
-        'region': random.choice(regions),
-        'customer_name': random.choice(['John Smith', 'María García', 'André Silva', 'François Müller', None]),  # some nulls
-        'status': random.choice(['Completed', 'Pending', 'Cancelled', ''])  # empty strings
-    }
+n_sales = scaled(500)
+order_width = max(4, len(str(n_sales)))
+
+
+def sales_chunk(start, n):
+    sales_df = pd.DataFrame({
+        'order_id': padded_ids('ORD', start, n, order_width),
+        'date': dates[rng.integers(0, len(dates), n)],
+        'product': pick(products, n),
+        'quantity': rng.integers(1, 11, n),
+        'price': np.round(rng.uniform(10, 1000, n), 2),
+        'region': pick(regions, n),
+        'customer_name': pick(['John Smith', 'María García', 'André Silva', 'François Müller', None], n),  # some nulls
+        'status': pick(['Completed', 'Pending', 'Cancelled', ''], n),  # empty strings
+    })
     # calculate revenue
-    sale['revenue'] = round(sale['quantity'] * sale['price'], 2)
-    sales_data.append(sale)
+    sales_df['revenue'] = np.round(sales_df['quantity'] * sales_df['price'], 2)
 
-sales_df = pd.DataFrame(sales_data)
-# add some intentional issues
-sales_df.loc[10:20, 'customer_name'] = None  # missing values
-sales_df.loc[30:35, 'quantity'] = -1  # data quality issue
-sales_df.to_csv('data/csv/sales_data.csv', index=False, encoding='utf-8')
-print(f"   Created with {len(sales_df)} records")
+    # add some intentional issues - same rows as the original 500 row file, repeated every 500 rows
+    pos = np.arange(start, start + n) % 500
+    sales_df.loc[(pos >= 10) & (pos <= 20), 'customer_name'] = None  # missing values
+    sales_df.loc[(pos >= 30) & (pos <= 35), 'quantity'] = -1  # data quality issue
+    return sales_df
+
+
+write_in_chunks('data/csv/sales_data.csv', n_sales, sales_chunk, encoding='utf-8')
+print(f"   Created with {n_sales} records")
 
 # Dataset 2: Employee data with different schema and encoding
 print("\n2. Creating employee_data.csv...")
 departments = ['HR', 'IT', 'Sales', 'Marketing', 'Finance']
-emp_data = []
-
-for i in range(200):
-    emp = {
-        'emp_id': f'E{i+1:03d}',
-        'name': random.choice(['Alice', 'Bob', 'José', 'François', 'Müller']),
-        'department': random.choice(departments),
-        'salary': random.randint(30000, 150000),
-        'hire_date': (datetime.now() - timedelta(days=random.randint(100, 2000))).strftime('%Y-%m-%d'),
-        'email': f'emp{i+1}@company.com',
-        'manager_id': f'E{random.randint(1, 50):03d}' if i > 50 else None
-    }
-    emp_data.append(emp)
-
-emp_df = pd.DataFrame(emp_data)
-emp_df.to_csv('data/csv/employee_data.csv', index=False, encoding='latin-1')
-print(f"   Created with {len(emp_df)} records (latin-1 encoding)")
+n_emp = scaled(200)
+emp_width = max(3, len(str(n_emp)))
+
+
+def employee_chunk(start, n):
+    idx = np.arange(start, start + n)
+    managers = 'E' + pd.Series(rng.integers(1, 51, n)).astype(str).str.zfill(emp_width)
+    return pd.DataFrame({
+        'emp_id': padded_ids('E', start, n, emp_width),
+        'name': pick(['Alice', 'Bob', 'José', 'François', 'Müller'], n),
+        'department': pick(departments, n),
+        'salary': rng.integers(30000, 150001, n),
+        'hire_date': days_ago(100, 2000, n),
+        'email': 'emp' + pd.Series(idx + 1).astype(str) + '@company.com',
+        'manager_id': managers.where(idx > 50, None),
+    })
+
+
+write_in_chunks('data/csv/employee_data.csv', n_emp, employee_chunk, encoding='latin-1')
+print(f"   Created with {n_emp} records (latin-1 encoding)")
 
 # Dataset 3: Customer feedback with special characters
 print("\n3. Creating customer_feedback.csv...")
-feedback_data = []
-ratings = [1, 2, 3, 4, 5]
 comments = [
     'Great product!',
     'Not bad, could be better',
@@ -78,57 +127,56 @@ comments = [
     'Product arrived damaged',
     'Very satisfied with purchase'
 ]
+n_feedback = scaled(150)
+
 
-for i in range(150):
-    feedback = {
-        'feedback_id': i+1,
-        'customer_id': f'CUST{random.randint(1, 100):04d}',
-        'product': random.choice(products),
-        'rating': random.choice(ratings),
-        'comment': random.choice(comments),
-        'date': (datetime.now() - timedelta(days=random.randint(1, 365))).strftime('%Y-%m-%d'),
-        'helpful_count': random.randint(0, 50)
-    }
-    feedback_data.append(feedback)
-
-feedback_df = pd.DataFrame(feedback_data)
-feedback_df.to_csv('data/csv/customer_feedback.csv', index=False)
-print(f"   Created with {len(feedback_df)} records")
+def feedback_chunk(start, n):
+    return pd.DataFrame({
+        'feedback_id': np.arange(start + 1, start + n + 1),
+        'customer_id': 'CUST' + pd.Series(rng.integers(1, 101, n)).astype(str).str.zfill(4),
+        'product': pick(products, n),
+        'rating': rng.integers(1, 6, n),
+        'comment': pick(comments, n),
+        'date': days_ago(1, 365, n),
+        'helpful_count': rng.integers(0, 51, n),
+    })
+
+
+write_in_chunks('data/csv/customer_feedback.csv', n_feedback, feedback_chunk)
+print(f"   Created with {n_feedback} records")
 
 # Dataset 4: Excel file with multiple sheets
 print("\n4. Creating multi_sheet_data.xlsx...")
 
-# Sheet 1: Product inventory
-inventory = {
-    'product_id': [f'P{i:03d}' for i in range(1, 51)],
-    'product_name': [random.choice(products) for _ in range(50)],
-    'category': [random.choice(['Electronics', 'Accessories', 'Peripherals']) for _ in range(50)],
-    'stock': [random.randint(0, 500) for _ in range(50)],
-    'reorder_level': [random.randint(10, 50) for _ in range(50)],
-    'supplier': [f'Supplier_{random.randint(1, 5)}' for _ in range(50)]
-}
-inventory_df = pd.DataFrame(inventory)
-
-# Sheet 2: Monthly sales summary
+# Sheet 1: Product inventory - scales too, but a sheet can't go past excel's row limit
+n_inventory = min(scaled(50), EXCEL_MAX_ROWS)
+inventory_df = pd.DataFrame({
+    'product_id': padded_ids('P', 0, n_inventory, max(3, len(str(n_inventory)))),
+    'product_name': pick(products, n_inventory),
+    'category': pick(['Electronics', 'Accessories', 'Peripherals'], n_inventory),
+    'stock': rng.integers(0, 501, n_inventory),
+    'reorder_level': rng.integers(10, 51, n_inventory),
+    'supplier': 'Supplier_' + pd.Series(rng.integers(1, 6, n_inventory)).astype(str),
+})
+
+# Sheet 2: Monthly sales summary (always one year)
 months = pd.date_range(start='2024-01-01', periods=12, freq='MS')
-monthly_sales = {
-    'month': [m.strftime('%Y-%m') for m in months],
-    'total_revenue': [random.randint(50000, 200000) for _ in range(12)],
-    'total_orders': [random.randint(100, 500) for _ in range(12)],
-    'avg_order_value': [round(random.uniform(100, 500), 2) for _ in range(12)],
-    'returns': [random.randint(5, 50) for _ in range(12)]
-}
-monthly_df = pd.DataFrame(monthly_sales)
-
-# Sheet 3: Regional performance
-regional_perf = {
+monthly_df = pd.DataFrame({
+    'month': months.strftime('%Y-%m'),
+    'total_revenue': rng.integers(50000, 200001, 12),
+    'total_orders': rng.integers(100, 501, 12),
+    'avg_order_value': np.round(rng.uniform(100, 500, 12), 2),
+    'returns': rng.integers(5, 51, 12),
+})
+
+# Sheet 3: Regional performance (4 regions x 4 quarters)
+regional_df = pd.DataFrame({
     'region': regions * 4,  # 4 quarters
     'quarter': ['Q1']*4 + ['Q2']*4 + ['Q3']*4 + ['Q4']*4,
-    'revenue': [random.randint(20000, 100000) for _ in range(16)],
-    'target': [random.randint(25000, 90000) for _ in range(16)],
-    'achievement_pct': [round(random.uniform(80, 120), 1) for _ in range(16)]
-}
-regional_df = pd.DataFrame(regional_perf)
+    'revenue': rng.integers(20000, 100001, 16),
+    'target': rng.integers(25000, 90001, 16),
+    'achievement_pct': np.round(rng.uniform(80, 120, 16), 1),
+})
 
 # write to excel with multiple sheets
 with pd.ExcelWriter('data/csv/multi_sheet_data.xlsx', engine='openpyxl') as writer:
@@ -136,28 +184,36 @@ with pd.ExcelWriter('data/csv/multi_sheet_data.xlsx', engine='openpyxl') as writ
     monthly_df.to_excel(writer, sheet_name='Monthly_Sales', index=False)
     regional_df.to_excel(writer, sheet_name='Regional_Performance', index=False)
 
-print("   Created with 3 sheets: Inventory, Monthly_Sales, Regional_Performance")
+print(f"   Created with 3 sheets: Inventory ({n_inventory} rows), Monthly_Sales, Regional_Performance")
 
-# Dataset 5: CSV with different delimiter 
+# Dataset 5: CSV with different delimiter
 print("\n5. Creating international_data.csv (semicolon delimiter)...")
-intl_data = {
-    'country': ['USA', 'UK', 'Germany', 'France', 'Spain', 'Italy'] * 20,
-    'year': [2024] * 120,
-    'gdp': [random.randint(1000, 20000) for _ in range(120)],
-    'population': [random.randint(10, 350) for _ in range(120)],
-    'currency': ['USD', 'GBP', 'EUR', 'EUR', 'EUR', 'EUR'] * 20
-}
-intl_df = pd.DataFrame(intl_data)
-intl_df.to_csv('data/csv/international_data.csv', index=False, sep=';')
-print(f"   Created with {len(intl_df)} records (semicolon delimiter)")
+countries = np.array(['USA', 'UK', 'Germany', 'France', 'Spain', 'Italy'])
+currencies = np.array(['USD', 'GBP', 'EUR', 'EUR', 'EUR', 'EUR'])
+n_intl = scaled(120)
+
+
+def intl_chunk(start, n):
+    country_idx = np.arange(start, start + n) % len(countries)  # countries take turns like before
+    return pd.DataFrame({
+        'country': countries[country_idx],
+        'year': np.full(n, 2024),
+        'gdp': rng.integers(1000, 20001, n),
+        'population': rng.integers(10, 351, n),
+        'currency': currencies[country_idx],
+    })
+
+
+write_in_chunks('data/csv/international_data.csv', n_intl, intl_chunk, sep=';')
+print(f"   Created with {n_intl} records (semicolon delimiter)")
 
 print("\n" + "="*60)
 print("Sample data generation complete!")
 print("="*60)
 print("\nFiles created:")
-print("1. data/csv/sales_data.csv (500 records, UTF-8)")
-print("2. data/csv/employee_data.csv (200 records, Latin-1 encoding)")
-print("3. data/csv/customer_feedback.csv (150 records)")
+print(f"1. data/csv/sales_data.csv ({n_sales} records, UTF-8)")
+print(f"2. data/csv/employee_data.csv ({n_emp} records, Latin-1 encoding)")
+print(f"3. data/csv/customer_feedback.csv ({n_feedback} records)")
 print("4. data/csv/multi_sheet_data.xlsx (3 sheets)")
-print("5. data/csv/international_data.csv (120 records, semicolon delimiter)")
-print("\nReady for csv_processing.py!")
\ No newline at end of file
+print(f"5. data/csv/international_data.csv ({n_intl} records, semicolon delimiter)")
+print("\nReady for csv_processing.py!")
@@ -0,0 +1,111 @@
+"""
+On-disk cache for API responses
+Every url gets its raw response body plus the ETag / Last-Modified the server sent, so the
+next run can send a conditional GET and skip the download (and the parsing) on a 304.
+The DataFrame built from a body can be cached next to it - it is thrown away whenever a
+new body is stored, so a cached frame always belongs to the cached body.
+"""
+
+import hashlib
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+import jsonio
+
+CACHE_DIR = os.path.join('outputs', '.cache', 'http')
+
+
+def cache_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+
+def _path(url, ext):
+    return os.path.join(CACHE_DIR, f'{cache_key(url)}.{ext}')
+
+
+def load_entry(url):
+    """metadata of the cached response for url (etag, last_modified, stored_at), or None"""
+    if not (os.path.exists(_path(url, 'json')) and os.path.exists(_path(url, 'body'))):
+        return None
+    return jsonio.load_file(_path(url, 'json'))
+
+
+def _save_entry(url, entry):
+    tmp = _path(url, 'json') + '.tmp'
+    jsonio.save_file(tmp, entry)
+    os.replace(tmp, _path(url, 'json'))
+
+
+def is_fresh(entry, ttl):
+    """true if the entry was stored or revalidated less than ttl seconds ago"""
+    return entry is not None and ttl is not None and time.time() - entry['stored_at'] < ttl
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since for a revalidation request"""
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def body_path(url):
+    return _path(url, 'body')
+
+
+def partial_body_path(url):
+    """where a streamed body is written while it downloads (store_response moves it into place)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return body_path(url) + '.part'
+
+
+def read_body(url):
+    with open(body_path(url), 'rb') as f:
+        return f.read()
+
+
+def store_response(url, resp, body_file=None):
+    """
+    keep the body and validators of a 200 response (any cached frame is now stale)
+    a streamed response has already been consumed - pass the file its body was written to
+    (it is moved into the cache)
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if os.path.exists(_path(url, 'feather')):
+        os.remove(_path(url, 'feather'))
+    if body_file is not None:
+        os.replace(body_file, body_path(url))
+    else:
+        with open(body_path(url), 'wb') as f:
+            f.write(resp.content)
+    _save_entry(url, {
+        'url': url,
+        'etag': resp.headers.get('ETag'),
+        'last_modified': resp.headers.get('Last-Modified'),
+        'stored_at': time.time(),
+    })
+
+
+def mark_revalidated(url, entry):
+    """the server said 304 - the cached body counts as fresh again"""
+    entry['stored_at'] = time.time()
+    _save_entry(url, entry)
+
+
+def load_frame(url):
+    """DataFrame built from the cached body by an earlier run, or None"""
+    if not os.path.exists(_path(url, 'feather')):
+        return None
+    return pd.read_feather(_path(url, 'feather'))
+
+
+def save_frame(url, df):
+    try:
+        df.to_feather(_path(url, 'feather'))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+        pass  # mixed-type columns - the body just gets parsed again next time
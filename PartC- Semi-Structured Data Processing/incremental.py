@@ -0,0 +1,204 @@
+"""
+State that lets the Part C stages work incrementally
+Small json files under outputs/state/ remember what earlier runs already processed,
+so a run only has to look at what is new since then.
+"""
+
+import hashlib
+import io
+import os
+import numpy as np
+import pandas as pd
+from csv_sniffer import sniff_csv
+import jsonio
+
+STATE_DIR = os.path.join('outputs', 'state')
+
+
+def state_path(name):
+    return os.path.join(STATE_DIR, f'{name}.json')
+
+
+def load_state(name):
+    path = state_path(name)
+    if not os.path.exists(path):
+        return None
+    return jsonio.load_file(path)
+
+
+def save_state(name, data):
+    """write to a temp file first so a crash never leaves half a state file behind"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = state_path(name) + '.tmp'
+    jsonio.save_file(tmp, data)
+    os.replace(tmp, state_path(name))
+
+
+def lookup(series, mapping):
+    """series.map(mapping) that only does one dict lookup per category for categorical columns"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        per_category = np.array([mapping.get(c, np.nan) for c in series.cat.categories] + [np.nan], dtype=float)
+        codes = series.cat.codes.to_numpy()  # -1 (missing) picks the trailing NaN
+        return pd.Series(per_category[codes], index=series.index)
+    return series.map(mapping).astype(float)
+
+
+class RatingAggregate:
+    """
+    Running rating sum / count / last feedback_id per product.
+    update() only folds in feedback rows with a feedback_id above the last one seen,
+    so history is never re-aggregated; enrich() adds avg_rating and num_reviews to
+    sales rows with a dict lookup instead of a merge.
+    """
+
+    STATE_NAME = 'product_ratings'
+
+    def __init__(self, rebuild=False):
+        state = None if rebuild else load_state(self.STATE_NAME)
+        self.last_feedback_id = state['last_feedback_id'] if state else 0
+        self.products = state['products'] if state else {}
+
+    def reset(self):
+        self.last_feedback_id = 0
+        self.products = {}
+
+    def update(self, feedback):
+        """fold in the feedback rows newer than the last run, returns how many there were"""
+        if len(feedback) == 0:
+            return 0
+        ids = feedback['feedback_id']
+        if int(ids.max()) < self.last_feedback_id:
+            # ids went backwards - the feedback file was regenerated, start over
+            print("  feedback ids went backwards, rebuilding the rating aggregate")
+            self.reset()
+
+        new = feedback[ids > self.last_feedback_id]
+        if len(new) == 0:
+            return 0
+
+        grouped = new.groupby('product', observed=True).agg(
+            rating_sum=('rating', 'sum'), rating_count=('rating', 'count'), last_id=('feedback_id', 'max'))
+        for product, rating_sum, rating_count, last_id in grouped.itertuples():
+            entry = self.products.setdefault(str(product), {'sum': 0, 'count': 0, 'last_feedback_id': 0})
+            entry['sum'] += int(rating_sum)
+            entry['count'] += int(rating_count)
+            entry['last_feedback_id'] = max(entry['last_feedback_id'], int(last_id))
+
+        self.last_feedback_id = max(self.last_feedback_id, int(new['feedback_id'].max()))
+        return len(new)
+
+    def save(self):
+        save_state(self.STATE_NAME, {'last_feedback_id': self.last_feedback_id, 'products': self.products})
+
+    def enrich(self, sales):
+        """add avg_rating / num_reviews columns to sales rows (a copy is returned)"""
+        averages = {p: e['sum'] / e['count'] for p, e in self.products.items() if e['count']}
+        counts = {p: e['count'] for p, e in self.products.items()}
+        enriched = sales.copy()
+        enriched['avg_rating'] = lookup(sales['product'], averages)
+        enriched['num_reviews'] = lookup(sales['product'], counts).astype('Int32')
+        return enriched
+
+
+class _ByteRange(io.RawIOBase):
+    """read-only view of the next `remaining` bytes of an open file"""
+
+    def __init__(self, f, remaining):
+        self.f = f
+        self.remaining = remaining
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.remaining <= 0:
+            return 0
+        data = self.f.read(min(len(b), self.remaining))
+        b[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+class CsvWatermark:
+    """
+    High-water mark for an append-only csv file.
+    Remembers the byte offset up to which rows were processed, the header, a hash of the
+    first bytes (so a replaced file is noticed and processed from scratch) and whatever
+    running totals the caller keeps in `totals`. new_rows() then reads only what was
+    appended since the last commit() - a half-written last line is left for the next run.
+    """
+
+    HEAD_BYTES = 4096
+
+    def __init__(self, name, path, reset=False):
+        self.name = name
+        self.path = path
+        state = None if reset else load_state(name)
+        if state is not None and not self._still_valid(state):
+            print(f"  {path} was replaced or truncated, processing it from the start")
+            state = None
+        self.state = state or {}
+        self.offset = self.state.get('offset', 0)
+        self.header = self.state.get('header')
+        self.totals = self.state.get('totals', {})
+        self.end = self._last_complete_line()
+
+    def _head_hash(self, length):
+        with open(self.path, 'rb') as f:
+            return hashlib.sha1(f.read(length)).hexdigest()
+
+    def _still_valid(self, state):
+        if state.get('path') != os.path.abspath(self.path):
+            return False
+        if os.path.getsize(self.path) < state['offset']:
+            return False
+        return self._head_hash(state['head_len']) == state['head_hash']
+
+    def _last_complete_line(self):
+        """offset just past the last newline in the file"""
+        size = os.path.getsize(self.path)
+        block = 64 * 1024
+        with open(self.path, 'rb') as f:
+            pos = size
+            while pos > self.offset:
+                start = max(self.offset, pos - block)
+                f.seek(start)
+                data = f.read(pos - start)
+                i = data.rfind(b'\n')
+                if i >= 0:
+                    return start + i + 1
+                pos = start
+        return self.offset
+
+    def has_new_rows(self):
+        return self.end > self.offset
+
+    def new_rows(self, chunksize, **read_kwargs):
+        """chunks of the rows appended since the last commit"""
+        if not self.has_new_rows():
+            return
+        settings = sniff_csv(self.path)
+        if self.offset > 0:
+            # we are starting mid-file, so the header has to come from the state
+            settings.update({'header': None, 'names': self.header})
+        settings.update(read_kwargs)
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            stream = io.BufferedReader(_ByteRange(f, self.end - self.offset))
+            for chunk in pd.read_csv(stream, chunksize=chunksize, **settings):
+                self.header = [str(c) for c in chunk.columns]
+                yield chunk
+
+    def commit(self):
+        """remember everything up to self.end as processed"""
+        head_len = min(self.HEAD_BYTES, self.end)
+        self.state.update({
+            'path': os.path.abspath(self.path),
+            'offset': self.end,
+            'head_len': head_len,
+            'head_hash': self._head_hash(head_len),
+            'header': self.header,
+            'totals': self.totals,
+        })
+        save_state(self.name, self.state)
+        self.offset = self.end
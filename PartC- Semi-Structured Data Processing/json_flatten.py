@@ -0,0 +1,88 @@
+"""
+Columnar flattener for nested JSON records
+The nested key layout is worked out once from a sample of records and compiled into a
+list of steps - one per key path - so flattening a batch is one pass over a column per
+key instead of building a new dict for every record and every level.
+Lists stay real lists (use DataFrame.explode on the column to get one row per item).
+"""
+
+import pandas as pd
+
+
+def _merge_layout(node, record):
+    """add the keys of one record to the layout tree (nested dicts, None marks a leaf)"""
+    for key, value in record.items():
+        if isinstance(value, dict):
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            _merge_layout(child, value)
+        elif key not in node:
+            node[key] = None
+
+
+def _compile(layout, sep):
+    """
+    layout tree -> steps (column name, parent step or -1 for the record itself, key, is_leaf)
+    in the same order a recursive flatten of the records would produce the columns
+    """
+    steps = []
+
+    def walk(node, parent, prefix):
+        for key, child in node.items():
+            name = f"{prefix}{sep}{key}" if prefix else str(key)
+            steps.append((name, parent, key, child is None))
+            if child is not None:
+                walk(child, len(steps) - 1, name)
+
+    walk(layout, -1, '')
+    return steps
+
+
+class Flattener:
+    """
+    flatten batches of nested records into DataFrames, e.g. {'address': {'geo': {'lat': ..}}}
+    becomes an address_geo_lat column. The key paths come from the first `sample_size`
+    records it sees and are reused for every later batch - keys that only show up after
+    the sample are not picked up.
+    """
+
+    def __init__(self, sep='_', sample_size=1000):
+        self.sep = sep
+        self.sample_size = sample_size
+        self.steps = None
+
+    def compile(self, sample):
+        layout = {}
+        for record in sample[:self.sample_size]:
+            if isinstance(record, dict):
+                _merge_layout(layout, record)
+        self.steps = _compile(layout, self.sep)
+
+    def flatten(self, records):
+        if self.steps is None:
+            self.compile(records)
+        columns = []
+        for name, parent, key, is_leaf in self.steps:
+            # each level is one list built from its parent level's list
+            parents = records if parent < 0 else columns[parent]
+            columns.append([v.get(key) if isinstance(v, dict) else None for v in parents])
+        return pd.DataFrame({name: columns[i] for i, (name, _, _, is_leaf) in enumerate(self.steps) if is_leaf},
+                            index=pd.RangeIndex(len(records)))
+
+
+def pluck(records, *path, default=None):
+    """
+    the values at one nested key path as a list, e.g. pluck(countries, 'name', 'common')
+    works a level at a time over the whole batch; default where a key (or level) is missing
+    """
+    missing = object()
+    values = records
+    for key in path:
+        values = [v.get(key, missing) if isinstance(v, dict) else missing for v in values]
+    return [default if v is missing else v for v in values]
+
+
+def flatten_records(records, sep='_'):
+    """one-off flatten of a list of records"""
+    return Flattener(sep=sep).flatten(records)
@@ -4,15 +4,62 @@ Author: Hemant Borana
 Date: Dec 2024
 
 This script handles JSON data from multiple REST APIs
-- JSONPlaceholder (users, posts)  
+- JSONPlaceholder (users, posts)
 - REST Countries API
+
+All endpoints are fetched at the same time (up to --concurrency at once) over one
+pooled keep-alive session, and each payload is processed as soon as it arrives.
+Responses are cached (http_cache.py): a source that answers 304 Not Modified is
+neither downloaded nor processed again. With --stream big payloads are parsed element
+by element while they download (json_stream.py) and flattened in batches, and with
+--paginate sources that support it are read page by page, each page appended to the
+output dataset as it arrives.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
-import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import argparse
 import os
+import queue
+import threading
+from datastore import DatasetWriter, output_exists, save_dataset
+from schemas import apply_schema
+import http_cache
+import json_stream
+import jsonio
+from json_flatten import Flattener, pluck
+
+parser = argparse.ArgumentParser(description='JSON API processing (Part C Task 1)')
+parser.add_argument('--no-csv', dest='export_csv', action='store_false',
+                    help='only write the columnar outputs, skip the csv copies')
+parser.add_argument('--from-raw', action='store_true',
+                    help='replay the raw archive of an earlier run (data/json/*_raw.jsonl.gz) instead of calling the apis')
+parser.add_argument('--concurrency', type=int, default=8,
+                    help='max requests in flight at the same time (default 8)')
+parser.add_argument('--mirror', default=None,
+                    help='fetch <mirror>/<name>_raw.json instead of the real apis, e.g. a local '
+                         '"python -m http.server -d data/json" for testing')
+parser.add_argument('--cache-ttl', type=float, default=None,
+                    help='seconds a cached response is used without asking the server again (default: always revalidate)')
+parser.add_argument('--offline', action='store_true',
+                    help='only use cached responses, never touch the network')
+parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                    help='always download and process everything')
+parser.add_argument('--stream', action='store_true',
+                    help='parse responses element by element while they download instead of loading them whole')
+parser.add_argument('--batch-size', type=int, default=10000,
+                    help='records flattened at a time (default 10000)')
+parser.add_argument('--paginate', action='store_true',
+                    help='read sources that have a pagination setting page by page')
+parser.add_argument('--page-size', type=int, default=None,
+                    help='records per page with --paginate (default: the source setting)')
+parser.add_argument('--pages-in-flight', type=int, default=4,
+                    help='pages downloaded ahead of processing at most (default 4)')
+args = parser.parse_args()
 
 # setup output folders
 if not os.path.exists('outputs'):
@@ -22,148 +69,373 @@ if not os.path.exists('data/json'):
 
 # keep track of errors
 errors_list = []
-all_data = {}
+all_data = {}  # dataset name -> records / columns / memory_kb
+
+def describe(df):
+    # (memory_kb is measured after the schema registry has made the small text columns categories)
+    return {
+        'records': len(df),
+        'columns': len(df.columns),
+        'memory_kb': round(df.memory_usage(deep=True).sum() / 1024, 2)
+    }
+
+def make_session(pool_size):
+    """one session for every request so connections are kept alive and reused"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def as_records(data):
+    return data if isinstance(data, list) else [data]
+
+def build_frame(source, records, archive=None):
+    """
+    flatten an iterable of records into a DataFrame --batch-size records at a time
+    (records can be a generator, e.g. array elements parsed while the body downloads),
+    every batch also goes to the raw archive if one is given
+    """
+    frames = []
+    for batch in json_stream.batches(records, args.batch_size):
+        if archive is not None:
+            archive.write(batch)
+        frames.append(source['flatten'](batch))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def stream_to_file(resp, path):
+    """yield the response body chunk by chunk while copying the bytes to path unchanged"""
+    with open(path, 'wb') as f:
+        for chunk in resp.iter_content(chunk_size=json_stream.READ_SIZE):
+            f.write(chunk)
+            yield chunk
+
+def recorded_records(api_name):
+    """records saved by an earlier run - the .jsonl.gz archive, or the older pretty-printed file"""
+    archive = jsonio.archive_path('data/json', api_name)
+    if os.path.exists(archive):
+        return jsonio.read_archive(archive)
+    legacy = f'data/json/{api_name}_raw.json'
+    if args.stream:
+        return json_stream.iter_array(json_stream.iter_file(legacy))
+    return as_records(jsonio.load_file(legacy))
+
+def get_json_from_api(session, source):
+    """
+    fetch json data from api and flatten it (blocking - runs in a worker thread)
+    returns (frame, unchanged) - when the cached response is still current that is (None, True)
+    and the body is only parsed later if the frame built from it can't be reused
+    """
+    api_name = source['name']
+    url = source_url(source)
+    if args.from_raw:
+        # offline run (benchmarks, no network) - replay the recorded response
+        print(f"\nLoading recorded {api_name} data...")
+        df = build_frame(source, recorded_records(api_name))
+        print(f"Got {len(df)} records from {api_name}")
+        return df, False
+
+    cached = http_cache.load_entry(url) if args.use_cache else None
+    if cached is not None and (args.offline or http_cache.is_fresh(cached, args.cache_ttl)):
+        print(f"\nUsing cached {api_name} (not asking the server)")
+        return None, True
+    if args.offline:
+        error = f"Failed to get {api_name}: nothing cached and --offline is on"
+        errors_list.append(error)
+        print(error)
+        return None, False
 
-def get_json_from_api(url, api_name):
-    """fetch json data from api"""
     print(f"\nFetching {api_name}...")
     try:
-        resp = requests.get(url, timeout=10)
+        resp = session.get(url, headers=http_cache.conditional_headers(cached), timeout=10, stream=args.stream)
+        if resp.status_code == 304 and cached is not None:
+            http_cache.mark_revalidated(url, cached)
+            print(f"{api_name} not modified since the last run, using the cached response")
+            return None, True
         resp.raise_for_status()
-        data = resp.json()
-        
-        # save raw json too
-        with open(f'data/json/{api_name}_raw.json', 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"Got {len(data) if isinstance(data, list) else 1} records from {api_name}")
-        return data
+
+        # the records also go to the compressed raw archive, a batch at a time
+        with jsonio.ArchiveWriter(jsonio.archive_path('data/json', api_name)) as archive:
+            if args.stream:
+                # parse while downloading - the exact bytes only need keeping for the http cache
+                if args.use_cache:
+                    body_file = http_cache.partial_body_path(url)
+                    chunks = stream_to_file(resp, body_file)
+                else:
+                    chunks = resp.iter_content(chunk_size=json_stream.READ_SIZE)
+                df = build_frame(source, json_stream.iter_array(chunks), archive)
+                if args.use_cache:
+                    http_cache.store_response(url, resp, body_file=body_file)
+            else:
+                data = jsonio.loads(resp.content)
+                if args.use_cache:
+                    http_cache.store_response(url, resp)
+                df = build_frame(source, as_records(data), archive)
+
+        print(f"Got {len(df)} records from {api_name}")
+        return df, False
     except Exception as e:
         error = f"Failed to get {api_name}: {str(e)}"
         errors_list.append(error)
         print(error)
-        return None
-
-def flatten_dict(d, parent='', sep='_'):
-    """flatten nested dictionaries - useful for address, geo, company etc"""
-    result = {}
-    for k, v in d.items():
-        new_key = f"{parent}{sep}{k}" if parent else k
-        if isinstance(v, dict):
-            result.update(flatten_dict(v, new_key, sep))
-        elif isinstance(v, list):
-            result[new_key] = str(v)  # convert lists to strings
-        else:
-            result[new_key] = v
-    return result
-
-# Task 1: Get users data (has nested address and company info)
-print("\n--- Processing Users Data ---")
-users_url = "https://jsonplaceholder.typicode.com/users"
-users_data = get_json_from_api(users_url, "users")
-
-if users_data:
-    # flatten each user record since address/company are nested
-    users_flat = []
-    for user in users_data:
-        flat = flatten_dict(user)
-        users_flat.append(flat)
-    
-    users_df = pd.DataFrame(users_flat)
+        return None, False
+
+# every source has a flatten step (a batch of records -> DataFrame, runs while downloading)
+# and a process step (the whole flattened frame -> cleaned and saved dataset)
+
+# Task 1: users data (has nested address and company info)
+# address/company are nested - the key paths (address_geo_lat etc) are worked out from the
+# first batch and reused for every later one, lists are kept as real list columns
+users_flattener = Flattener()
+
+def flatten_users(users_data):
+    return users_flattener.flatten(users_data)
+
+def process_users(users_df):
+    print("\n--- Processing Users Data ---")
     users_df.fillna('N/A', inplace=True)  # handle missing values
-    
+    users_df = apply_schema(users_df, 'users')
+
     print(f"Created dataframe with {len(users_df)} rows, {len(users_df.columns)} columns")
     print(f"Columns: {list(users_df.columns[:5])}...")  # show first 5 cols
-    
+
     # save it
-    users_df.to_csv('outputs/users_processed.csv', index=False)
+    save_dataset(users_df, 'users_processed', export_csv=args.export_csv)
     users_df.to_excel('outputs/users_processed.xlsx', index=False)
-    all_data['users'] = users_df
+    all_data['users'] = describe(users_df)
     print("Saved users data")
+    return users_df
 
-# Task 2: Get posts data (simpler structure)
-print("\n--- Processing Posts Data ---")
-posts_url = "https://jsonplaceholder.typicode.com/posts"
-posts_data = get_json_from_api(posts_url, "posts")
+# Task 2: posts data (simpler structure)
+def flatten_posts(posts_data):
+    return pd.DataFrame(posts_data)
 
-if posts_data:
-    posts_df = pd.DataFrame(posts_data)
-    
+def prepare_posts(posts_df):
+    """row by row fixes - also used on single pages with --paginate"""
     # add some extra fields
     posts_df['title_length'] = posts_df['title'].str.len()
     posts_df['body_length'] = posts_df['body'].str.len()
     posts_df['processed_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
+    posts_df.fillna('N/A', inplace=True)
+    return apply_schema(posts_df, 'posts')
+
+def process_posts(posts_df):
+    print("\n--- Processing Posts Data ---")
     # check for nulls
     null_count = posts_df.isnull().sum().sum()
     print(f"Found {null_count} null values")
-    posts_df.fillna('N/A', inplace=True)
-    
+    posts_df = prepare_posts(posts_df)
+
     print(f"Posts by user: {posts_df.groupby('userId').size().head()}")
-    
-    posts_df.to_csv('outputs/posts_processed.csv', index=False)
-    all_data['posts'] = posts_df
+
+    save_dataset(posts_df, 'posts_processed', export_csv=args.export_csv)
+    all_data['posts'] = describe(posts_df)
     print("Saved posts data")
+    return posts_df
 
-# Task 3: Get countries data (very nested - name, currencies, languages etc)
-print("\n--- Processing Countries Data ---")
-countries_url = "https://restcountries.com/v3.1/all?fields=name,capital,region,subregion,population,area,languages,currencies,independent"
-countries_data = get_json_from_api(countries_url, "countries")
+# Task 3: countries data (very nested - name, currencies, languages etc)
+def first_item(value):
+    """first capital - the api sends a list, sometimes empty"""
+    if isinstance(value, list):
+        return value[0] if value else 'N/A'
+    return value if value else 'N/A'
 
-if countries_data:
-    # manually extract fields because its too nested
-    countries = []
-    for c in countries_data[:50]:  # just first 50 to keep it fast
-        try:
-            # safely get nested values
-            name = c.get('name', {}).get('common', 'Unknown')
-            capital = c.get('capital', ['N/A'])
-            capital = capital[0] if capital else 'N/A'
-            
-            # languages come as dict - join them
-            langs = c.get('languages', {})
-            langs_str = ', '.join(langs.values()) if langs else 'N/A'
-            
-            # same for currencies
-            curr = c.get('currencies', {})
-            curr_str = ', '.join(curr.keys()) if curr else 'N/A'
-            
-            country = {
-                'name': name,
-                'official': c.get('name', {}).get('official', 'N/A'),
-                'capital': capital,
-                'region': c.get('region', 'N/A'),
-                'subregion': c.get('subregion', 'N/A'),
-                'population': c.get('population', 0),
-                'area': c.get('area', 0),
-                'languages': langs_str,
-                'currencies': curr_str,
-                'independent': c.get('independent', False)
-            }
-            countries.append(country)
-        except:
-            continue  # skip if any error
-    
-    countries_df = pd.DataFrame(countries)
+def join_names(value, keys=False):
+    """languages / currencies come as dicts - join their values (or keys)"""
+    if not isinstance(value, dict) or not value:
+        return 'N/A'
+    return ', '.join(str(v) for v in (value.keys() if keys else value.values()))
+
+def flatten_countries(countries_data):
+    # one pass over the batch per field instead of a .get() chain per record
+    countries_data = [c for c in countries_data if isinstance(c, dict)]
+    return pd.DataFrame({
+        'name': pluck(countries_data, 'name', 'common', default='Unknown'),
+        'official': pluck(countries_data, 'name', 'official', default='N/A'),
+        'capital': [first_item(c) for c in pluck(countries_data, 'capital', default=['N/A'])],
+        'region': pluck(countries_data, 'region', default='N/A'),
+        'subregion': pluck(countries_data, 'subregion', default='N/A'),
+        'population': pluck(countries_data, 'population', default=0),
+        'area': pluck(countries_data, 'area', default=0),
+        'languages': [join_names(v) for v in pluck(countries_data, 'languages')],
+        'currencies': [join_names(v, keys=True) for v in pluck(countries_data, 'currencies')],
+        'independent': pluck(countries_data, 'independent', default=False),
+    })
+
+def process_countries(countries_df):
+    print("\n--- Processing Countries Data ---")
+    countries_df = apply_schema(countries_df, 'countries')
     print(f"Processed {len(countries_df)} countries")
     print(f"Regions found: {countries_df['region'].unique()}")
     print(f"Total population: {countries_df['population'].sum():,}")
-    
-    countries_df.to_csv('outputs/countries_processed.csv', index=False)
+
+    save_dataset(countries_df, 'countries_processed', export_csv=args.export_csv)
     countries_df.to_excel('outputs/countries_processed.xlsx', index=False)
-    all_data['countries'] = countries_df
+    all_data['countries'] = describe(countries_df)
     print("Saved countries data")
+    return countries_df
+
+# every endpoint, the function that turns its payload into a dataset and the dataset it saves
+# pagination (used with --paginate) says how the api splits its data into pages:
+#   style 'offset' - offset_param / size_param, 'page' - page_param / size_param (pages start at first_page),
+#   'cursor' - cursor_param, with the next cursor at cursor_path in each page's body
+#   items_path is where the records sit in a page body (leave it out if the body is the list),
+#   prepare is the row by row part of the processing that can run on one page
+SOURCES = [
+    {'name': 'users', 'url': "https://jsonplaceholder.typicode.com/users",
+     'flatten': flatten_users, 'process': process_users, 'output': 'users_processed'},
+    {'name': 'posts', 'url': "https://jsonplaceholder.typicode.com/posts",
+     'flatten': flatten_posts, 'process': process_posts, 'output': 'posts_processed',
+     'pagination': {'style': 'page', 'page_param': '_page', 'size_param': '_limit', 'page_size': 20,
+                    'first_page': 1},
+     'prepare': prepare_posts},
+    {'name': 'countries',
+     'url': "https://restcountries.com/v3.1/all?fields=name,capital,region,subregion,population,area,languages,currencies,independent",
+     'flatten': flatten_countries, 'process': process_countries, 'output': 'countries_processed'},
+]
+
+def source_url(source):
+    if args.mirror:
+        return f"{args.mirror.rstrip('/')}/{source['name']}_raw.json"
+    return source['url']
+
+def iter_pages(session, source):
+    """yield the records of one page after the other until the api runs out"""
+    paging = source['pagination']
+    size = args.page_size or paging['page_size']
+    offset, number, cursor = 0, paging.get('first_page', 1), None
+    while True:
+        params = {paging['size_param']: size} if paging.get('size_param') else {}
+        if paging['style'] == 'offset':
+            params[paging['offset_param']] = offset
+        elif paging['style'] == 'page':
+            params[paging['page_param']] = number
+        elif cursor is not None:
+            params[paging['cursor_param']] = cursor
+
+        resp = session.get(source_url(source), params=params, timeout=10)
+        resp.raise_for_status()
+        body = jsonio.loads(resp.content)
+        records = pluck([body], *paging['items_path'])[0] if paging.get('items_path') else body
+        if not records:
+            return
+        yield records
+
+        if paging['style'] == 'cursor':
+            cursor = pluck([body], *paging['cursor_path'])[0]
+            if not cursor:
+                return
+        elif len(records) < size:
+            return  # a short page is the last one
+        offset += len(records)
+        number += 1
+
+def bounded(items, max_waiting):
+    """
+    run a generator in a background thread with at most max_waiting results queued -
+    when the consumer falls behind the producer blocks (backpressure)
+    """
+    waiting = queue.Queue(maxsize=max_waiting)
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                waiting.put(item)
+            waiting.put(done)
+        except Exception as e:
+            waiting.put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = waiting.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def ingest_pages(session, source):
+    """
+    paginated source: pages flow download -> flatten -> prepare -> append to the dataset,
+    with only a few pages in memory at any time (blocking - runs in a worker thread)
+    """
+    api_name = source['name']
+    print(f"\nFetching {api_name} page by page...")
+    pages = 0
+    try:
+        # the raw archive gets each page as it comes in
+        with DatasetWriter(source['output'], export_csv=args.export_csv, chunked=True) as writer, \
+                jsonio.ArchiveWriter(jsonio.archive_path('data/json', api_name)) as archive:
+            for records in bounded(iter_pages(session, source), args.pages_in_flight):
+                archive.write(records)
+                writer.write(source['prepare'](source['flatten'](records)))
+                pages += 1
+    except Exception as e:
+        error = f"Failed to get {api_name}: {str(e)} (after {pages} pages)"
+        errors_list.append(error)
+        print(error)
+        return
+
+    if writer.profile is not None:
+        profile = writer.profile
+        all_data[api_name] = {'records': profile['rows'], 'columns': profile['columns'],
+                              'memory_kb': profile['memory_kb']}
+    print(f"Got {writer.rows} records from {api_name} in {pages} pages, saved {source['output']}")
+
+def paginated(source):
+    # the recorded / mirrored responses are whole payloads, they can't be paged
+    return args.paginate and 'pagination' in source and not (args.from_raw or args.mirror or args.offline)
+
+async def fetch(session, pool, limit, source):
+    """download one source in a worker thread, at most `limit` at the same time"""
+    async with limit:
+        loop = asyncio.get_running_loop()
+        if paginated(source):
+            await loop.run_in_executor(pool, ingest_pages, session, source)
+            return source, None, False
+        df, unchanged = await loop.run_in_executor(pool, get_json_from_api, session, source)
+    return source, df, unchanged
+
+def handle_payload(source, df, unchanged):
+    """process a flattened payload - or reuse the dataset built last time if the response has not changed"""
+    url = source_url(source)
+    if unchanged:
+        cached_df = http_cache.load_frame(url)
+        if cached_df is not None and output_exists(source['output']):
+            print(f"\n--- {source['name']}: unchanged, reusing the saved {source['output']} ---")
+            all_data[source['name']] = describe(apply_schema(cached_df, source['name']))
+            return
+        if args.stream:
+            df = build_frame(source, json_stream.iter_array(json_stream.iter_file(http_cache.body_path(url))))
+        else:
+            df = build_frame(source, as_records(jsonio.loads(http_cache.read_body(url))))
+    df = source['process'](df)
+    if args.use_cache and http_cache.load_entry(url) is not None:
+        http_cache.save_frame(url, df)
+
+async def fetch_and_process(sources, concurrency):
+    """start every download at once and process each payload in the order they finish"""
+    limit = asyncio.Semaphore(concurrency)
+    with make_session(concurrency) as session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        tasks = [fetch(session, pool, limit, s) for s in sources]
+        for finished in asyncio.as_completed(tasks):
+            source, df, unchanged = await finished
+            if df is not None or unchanged:
+                try:
+                    handle_payload(source, df, unchanged)
+                except Exception as e:
+                    error = f"Failed to process {source['name']}: {str(e)}"
+                    errors_list.append(error)
+                    print(error)
+
+asyncio.run(fetch_and_process(SOURCES, args.concurrency))
 
 # create a summary of all datasets
 print("\n--- Creating Summary ---")
 summary_data = []
-for name, df in all_data.items():
-    summary_data.append({
-        'dataset': name,
-        'records': len(df),
-        'columns': len(df.columns),
-        'memory_kb': round(df.memory_usage(deep=True).sum() / 1024, 2)
-    })
+for name in [s['name'] for s in SOURCES if s['name'] in all_data]:  # same order every run
+    summary_data.append(dict(dataset=name, **all_data[name]))
 
 summary_df = pd.DataFrame(summary_data)
 summary_df.to_csv('outputs/json_summary.csv', index=False)
@@ -178,9 +450,9 @@ Datasets Processed: {len(all_data)}
 Total Errors: {len(errors_list)}
 
 Output Files:
-- users_processed.csv ({len(all_data.get('users', []))} records)
-- posts_processed.csv ({len(all_data.get('posts', []))} records)  
-- countries_processed.csv ({len(all_data.get('countries', []))} records)
+- users_processed.csv ({all_data.get('users', {}).get('records', 0)} records)
+- posts_processed.csv ({all_data.get('posts', {}).get('records', 0)} records)
+- countries_processed.csv ({all_data.get('countries', {}).get('records', 0)} records)
 - json_summary.csv
 
 """
@@ -194,4 +466,4 @@ with open('outputs/json_report.txt', 'w') as f:
     f.write(report)
 
 print("\n" + report)
-print("Report Generated.")
\ No newline at end of file
+print("Report Generated.")
@@ -0,0 +1,88 @@
+"""
+Incremental JSON array reader
+Splits a top-level JSON array into its elements while the bytes are still arriving
+(from a response or a file), so a big payload is never held in memory as one string
+or as one list of python objects.
+"""
+
+import codecs
+import json
+
+READ_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+def iter_file(path, size=READ_SIZE):
+    """byte chunks of a file"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_array(chunks, encoding='utf-8'):
+    """
+    yield the elements of the json array spread over the byte chunks, one at a time
+    a document that is not an array (e.g. a single object) is yielded whole
+    """
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    buf, pos = '', 0
+    started = False
+    eof = False
+    wait_for = 0  # after a failed decode don't retry until the buffer has doubled
+
+    while True:
+        while pos < len(buf) and (buf[pos] in WHITESPACE or (started and buf[pos] == ',')):
+            pos += 1
+
+        if pos < len(buf) and (eof or len(buf) - pos >= wait_for):
+            if not started:
+                if buf[pos] != '[':
+                    rest = buf[pos:] + ''.join(text_decoder.decode(c) for c in chunks)
+                    yield json.loads(rest + text_decoder.decode(b'', final=True))
+                    return
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                obj, end = _decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+            # only trust a value once the separator after it has arrived - "12" may still become "12.5"
+            if end is not None and (eof or (end < len(buf) and buf[end] in WHITESPACE + ',]')):
+                yield obj
+                pos = end
+                wait_for = 0
+                continue
+            wait_for = 2 * (len(buf) - pos)
+
+        if eof:
+            raise ValueError("json ended before the array was closed" if started else "empty json document")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            text = text_decoder.decode(b'', final=True)
+        else:
+            text = text_decoder.decode(chunk)
+        buf, pos = buf[pos:] + text, 0
+
+
+def batches(items, size):
+    """lists of up to `size` items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,93 @@
+"""
+JSON reading / writing for the whole project
+Uses orjson when it is installed (several times faster, and it handles numpy values)
+and falls back to the standard json module otherwise.
+The raw API archive is kept as gzip-compressed JSON Lines - one record per line - so it
+can be written a page/batch at a time and streamed back record by record for replay.
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ARCHIVE_SUFFIX = '_raw.jsonl.gz'
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj):
+        """obj as compact json bytes"""
+        return orjson.dumps(obj, option=_OPTIONS)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps(obj):
+        """obj as compact json bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+def load_file(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def save_file(path, obj):
+    with open(path, 'wb') as f:
+        f.write(dumps(obj))
+
+
+def archive_path(folder, name):
+    return os.path.join(folder, f'{name}{ARCHIVE_SUFFIX}')
+
+
+class ArchiveWriter:
+    """
+    append records to a .jsonl.gz archive one batch at a time
+    written to a temp file and moved into place on close, so a failed run keeps the old archive
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.records = 0
+        self._tmp = path + '.tmp'
+        self._file = gzip.open(self._tmp, 'wb', compresslevel=compresslevel)
+
+    def write(self, records):
+        if records:
+            self._file.write(b'\n'.join(dumps(r) for r in records) + b'\n')
+            self.records += len(records)
+
+    def close(self, keep=True):
+        self._file.close()
+        if keep:
+            os.replace(self._tmp, self.path)
+        else:
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(keep=exc_type is None)
+
+
+def write_archive(path, records):
+    with ArchiveWriter(path) as archive:
+        archive.write(records)
+
+
+def read_archive(path):
+    """yield the records of a .jsonl.gz archive one at a time"""
+    with gzip.open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
@@ -0,0 +1,123 @@
+"""
+One-pass dataset profiler
+Every column is hashed once; row count, per-column nulls, distinct estimates, min/max
+and the duplicate row count all come out of that single pass. Datasets get their
+profile written as a sidecar file when they are saved (see datastore.py) so the
+master catalog can be built without loading the data again.
+"""
+
+import numpy as np
+import pandas as pd
+
+SKETCH_SIZE = 256  # k for the k-minimum-values distinct estimate (~6% error past k values)
+HASH_SPACE = float(2 ** 64)
+ROW_HASH_PRIME = np.uint64(1099511628211)
+
+
+def _sketch(hashes, k=SKETCH_SIZE):
+    """k smallest distinct hashes - small enough to keep, mergeable across chunks"""
+    return np.unique(hashes)[:k]
+
+
+def _estimate(sketch, k=SKETCH_SIZE):
+    if len(sketch) < k:
+        return len(sketch)  # fewer than k distinct values seen - the count is exact
+    return int(round((k - 1) * HASH_SPACE / (float(sketch[-1]) + 1)))
+
+
+def _to_python(value):
+    """numpy / pandas scalars to something json can store"""
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class ProfileBuilder:
+    """
+    Collects the profile of a dataset one chunk at a time.
+    Duplicates can only be counted exactly while the whole dataset arrives as one chunk -
+    tracking them across chunks would need every row hash in memory - so after a second
+    chunk they are reported as None.
+    """
+
+    def __init__(self, previous=None):
+        self.rows = 0
+        self.memory_bytes = 0
+        self.duplicates = 0
+        self.chunks = 0
+        self.columns = {}
+        if previous is not None:
+            self._load(previous)
+
+    def _load(self, profile):
+        # continue from a saved profile (used when rows are appended to a dataset)
+        self.rows = profile['rows']
+        self.memory_bytes = int(profile['memory_kb'] * 1024)
+        self.duplicates = profile['duplicates']
+        self.chunks = max(profile.get('chunks', 1), 1)
+        for col, stats in profile['column_stats'].items():
+            self.columns[col] = dict(stats, sketch=np.array(stats['sketch'], dtype=np.uint64))
+
+    def add(self, df):
+        self.chunks += 1
+        self.rows += len(df)
+        self.memory_bytes += int(df.memory_usage(deep=True, index=False).sum())
+
+        row_hash = np.zeros(len(df), dtype=np.uint64)
+        for col in df.columns:
+            s = df[col]
+            try:
+                hashes = pd.util.hash_pandas_object(s, index=False).to_numpy()
+            except TypeError:
+                # unhashable cells (lists, dicts) - hash their text form instead
+                hashes = pd.util.hash_pandas_object(s.astype(str), index=False).to_numpy()
+            row_hash = (row_hash ^ hashes) * ROW_HASH_PRIME
+
+            nulls = s.isna().to_numpy()
+            stats = self.columns.setdefault(col, {'dtype': str(s.dtype), 'nulls': 0, 'min': None, 'max': None,
+                                                  'sketch': np.array([], dtype=np.uint64)})
+            stats['nulls'] += int(nulls.sum())
+            stats['sketch'] = _sketch(np.concatenate([stats['sketch'], hashes[~nulls]]))
+
+            if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_datetime64_any_dtype(s):
+                if not pd.api.types.is_bool_dtype(s) and nulls.sum() < len(s):
+                    lo, hi = _to_python(s.min()), _to_python(s.max())
+                    stats['min'] = lo if stats['min'] is None else min(stats['min'], lo)
+                    stats['max'] = hi if stats['max'] is None else max(stats['max'], hi)
+
+        if self.chunks == 1:
+            self.duplicates = int(len(row_hash) - len(pd.unique(row_hash)))
+        else:
+            self.duplicates = None
+
+    def result(self):
+        column_stats = {}
+        for col, stats in self.columns.items():
+            column_stats[col] = {
+                'dtype': stats['dtype'],
+                'nulls': stats['nulls'],
+                'distinct_estimate': _estimate(stats['sketch']),
+                'min': stats['min'],
+                'max': stats['max'],
+                'sketch': [int(h) for h in stats['sketch']],
+            }
+        return {
+            'rows': self.rows,
+            'columns': len(self.columns),
+            'memory_kb': round(self.memory_bytes / 1024, 2),
+            'null_values': sum(c['nulls'] for c in column_stats.values()),
+            'duplicates': self.duplicates,
+            'chunks': self.chunks,
+            'column_stats': column_stats,
+        }
+
+
+def profile_dataframe(df):
+    """profile of a frame that is already in memory"""
+    builder = ProfileBuilder()
+    builder.add(df)
+    return builder.result()
@@ -0,0 +1,128 @@
+"""
+Dtype schema registry
+One entry per dataset listing its low-cardinality text columns (stored as categories),
+its integer columns with a fixed small width, and its date columns. The CSV, JSON, XML
+and text stages apply these when they read or build a dataset, instead of leaving
+everything as object strings and int64.
+"""
+
+import pandas as pd
+
+# integer widths are nullable pandas types so a missing value never breaks a read,
+# and they are fixed (not data dependent) so every chunk of a streamed file gets the same dtype
+SCHEMAS = {
+    # csv_processing.py
+    'sales': {
+        'category': ['product', 'region', 'status'],
+        'integer': {'quantity': 'Int32'},
+        'dates': ['date'],
+    },
+    'employees': {
+        'category': ['department'],
+        'integer': {'salary': 'Int32'},
+        'dates': ['hire_date'],
+    },
+    'feedback': {
+        'category': ['product', 'customer_id'],
+        'integer': {'feedback_id': 'Int32', 'rating': 'Int8', 'helpful_count': 'Int16'},
+        'dates': ['date'],
+    },
+    'international': {
+        'category': ['country', 'currency'],
+        'integer': {'year': 'Int16', 'gdp': 'Int32', 'population': 'Int32'},
+    },
+    'Inventory': {
+        'category': ['product_name', 'category', 'supplier'],
+        'integer': {'stock': 'Int32', 'reorder_level': 'Int32'},
+    },
+    'Monthly_Sales': {
+        'integer': {'total_revenue': 'Int64', 'total_orders': 'Int32', 'returns': 'Int32'},
+    },
+    'Regional_Performance': {
+        'category': ['region', 'quarter'],
+        'integer': {'revenue': 'Int64', 'target': 'Int64'},
+    },
+    # json_processing.py
+    'users': {
+        'integer': {'id': 'Int32'},
+    },
+    'posts': {
+        'integer': {'userId': 'Int32', 'id': 'Int32', 'title_length': 'Int32', 'body_length': 'Int32'},
+        'dates': ['processed_at'],
+    },
+    'countries': {
+        'category': ['region', 'subregion'],
+        'integer': {'population': 'Int64'},
+    },
+    # xml_processing.py
+    'books': {
+        'category': ['category', 'currency', 'author'],
+        'dates': ['publish_date'],
+    },
+    'xml_employees': {
+        'category': ['department', 'position'],
+        'integer': {'salary': 'Int32'},
+    },
+    'products': {
+        'category': ['category', 'supplier'],
+        'integer': {'stock': 'Int32'},
+    },
+    'news': {
+        'category': ['category'],
+    },
+    # Part D text_processing.py / data_integration_pipeline.py
+    'scraped_text': {
+        'category': ['source', 'topic', 'text_category'],
+        'integer': {'word_count': 'Int32', 'char_count': 'Int32', 'sentence_count': 'Int32'},
+        'dates': ['scraped_date', 'processed_date'],
+    },
+    'integrated_text': {
+        'category': ['source_type', 'topic', 'text_category', 'length_category', 'source',
+                     'language', 'format', 'quality_flag', 'category', 'accessibility',
+                     'retention_period'],
+        'integer': {'word_count': 'Int32', 'char_count': 'Int32', 'sentence_count': 'Int32'},
+        'dates': ['scraped_date', 'collection_date', 'processing_date'],
+    },
+}
+
+# merged / integrated outputs reuse the schema of the data they came from
+SCHEMAS['sales_with_ratings'] = dict(SCHEMAS['sales'], integer={**SCHEMAS['sales']['integer'], 'num_reviews': 'Int32'})
+SCHEMAS['integrated_employees'] = {'category': ['department', 'source'], 'integer': {'salary': 'Int32'}}
+
+
+def get_schema(name):
+    return SCHEMAS.get(name, {})
+
+
+def read_options(name, columns=None):
+    """dtype / parse_dates arguments for pd.read_csv, limited to `columns` if given"""
+    schema = get_schema(name)
+
+    def wanted(col):
+        return columns is None or col in columns
+
+    dtype = {c: 'category' for c in schema.get('category', []) if wanted(c)}
+    dtype.update({c: t for c, t in schema.get('integer', {}).items() if wanted(c)})
+    dates = [c for c in schema.get('dates', []) if wanted(c)]
+
+    options = {}
+    if dtype:
+        options['dtype'] = dtype
+    if dates:
+        options['parse_dates'] = dates
+    return options
+
+
+def apply_schema(df, name):
+    """cast a frame that was built in memory (json, xml, excel, text) to its registered dtypes"""
+    schema = get_schema(name)
+    for col in schema.get('category', []):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col, dtype in schema.get('integer', {}).items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    for col in schema.get('dates', []):
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
@@ -7,7 +7,15 @@ Processing different XML structures, attributes, namespaces
 import xml.etree.ElementTree as ET
 import pandas as pd
 from datetime import datetime
+import argparse
 import os
+from datastore import save_dataset
+from schemas import apply_schema
+
+parser = argparse.ArgumentParser(description='XML processing (Part C Task 3)')
+parser.add_argument('--no-csv', dest='export_csv', action='store_false',
+                    help='only write the columnar outputs, skip the csv copies')
+args = parser.parse_args()
 
 results = {}
 
@@ -37,7 +45,7 @@ for book in root.findall('book'):
     }
     books.append(book_data)
 
-books_df = pd.DataFrame(books)
+books_df = apply_schema(pd.DataFrame(books), 'books')
 print(f"found {len(books_df)} books")
 print(f"categories: {books_df['category'].unique()}")
 
@@ -91,11 +99,11 @@ for dept in root.findall('department'):
         }
         employees.append(emp_data)
 
-emp_df = pd.DataFrame(employees)
+emp_df = apply_schema(pd.DataFrame(employees), 'xml_employees')
 print(f"found {len(emp_df)} employees")
 
 # group by department
-dept_count = emp_df.groupby('department').size()
+dept_count = emp_df.groupby('department', observed=True).size()
 print("by department:")
 print(dept_count)
 
@@ -134,7 +142,7 @@ for product in root.findall('prod:product', namespaces):
     }
     products.append(prod_data)
 
-prod_df = pd.DataFrame(products)
+prod_df = apply_schema(pd.DataFrame(products), 'products')
 print(f"found {len(prod_df)} products")
 
 # check stock status
@@ -165,7 +173,7 @@ for item in channel.findall('item'):
     }
     news_items.append(news)
 
-news_df = pd.DataFrame(news_items)
+news_df = apply_schema(pd.DataFrame(news_items), 'news')
 print(f"found {len(news_df)} news items")
 
 # categories breakdown
@@ -176,12 +184,11 @@ print(cats)
 results['news'] = news_df
 print("done\n")
 
-# convert all to structured format (CSV)
-print("--- Saving to CSV ---")
+# convert all to structured format (columnar + CSV copy)
+print("--- Saving Outputs ---")
 for name, df in results.items():
-    filename = f'outputs/{name}_from_xml.csv'
-    df.to_csv(filename, index=False)
-    print(f"saved {filename}")
+    save_dataset(df, f'{name}_from_xml', export_csv=args.export_csv)
+    print(f"saved {name}_from_xml")
 
 # create summary
 print("\n--- XML Processing Summary ---")
@@ -213,7 +220,9 @@ Output Files Created:
 """
 
 for name in results.keys():
-    report += f"- outputs/{name}_from_xml.csv\n"
+    report += f"- outputs/columnar/{name}_from_xml/\n"
+    if args.export_csv:
+        report += f"- outputs/{name}_from_xml.csv\n"
 
 report += "\nXPath expressions used for extraction demonstrated.\n"
 report += "Namespace handling implemented for products.xml\n"
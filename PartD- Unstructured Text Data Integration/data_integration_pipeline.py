@@ -8,8 +8,13 @@ import pandas as pd
 import os
 from datetime import datetime
 import json
+import sys
 from collections import Counter
 
+# shared helpers (dtype registry etc.) live next to the Part C scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PartC- Semi-Structured Data Processing'))
+from schemas import apply_schema, read_options
+
 print("\n" + "="*70)
 print("PART D - TASK 2: UNSTRUCTURED DATA INTEGRATION")
 print("="*70 + "\n")
@@ -21,7 +26,7 @@ if not os.path.exists('outputs/text/scraped_text_data.csv'):
 
 # load the scraped text data
 print("--- Loading Scraped Text Data ---\n")
-text_df = pd.read_csv('outputs/text/scraped_text_data.csv')
+text_df = pd.read_csv('outputs/text/scraped_text_data.csv', **read_options('scraped_text'))
 print(f"Loaded {len(text_df)} text documents")
 print(f"Sources: {text_df['source'].unique()}")
 
@@ -162,6 +167,7 @@ final_integrated = unified_df.merge(
     on='document_id', 
     how='left'
 )
+final_integrated = apply_schema(final_integrated, 'integrated_text')
 
 print(f"Final integrated dataset: {len(final_integrated)} records")
 print(f"Total columns: {len(final_integrated.columns)}")
@@ -10,6 +10,11 @@ import pandas as pd
 from datetime import datetime
 import re
 import os
+import sys
+
+# shared helpers (dtype registry etc.) live next to the Part C scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PartC- Semi-Structured Data Processing'))
+from schemas import apply_schema
 
 os.makedirs('outputs/text', exist_ok=True)
 os.makedirs('data/text', exist_ok=True)
@@ -206,6 +211,7 @@ if len(df) > 0:
     print("Creating metadata...")
     df['processed_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     df['text_category'] = df['source'].apply(lambda x: 'encyclopedia' if 'Wiki' in x else 'news' if 'News' in x else 'quotes')
+    df = apply_schema(df, 'scraped_text')
     
     # save raw scraped data
     df.to_csv('outputs/text/scraped_text_data.csv', index=False)
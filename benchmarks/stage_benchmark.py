@@ -0,0 +1,231 @@
+"""
+Stage benchmark - Part C / Part D pipeline throughput
+Runs every offline stage (CSV, JSON from recorded responses, XML, final integration
+and the Part D text integration) at a few input scales in a scratch copy of the repo,
+and reports wall time, rows/sec and peak memory (RSS) per stage.
+
+python benchmarks/stage_benchmark.py --scales 1 10 100
+python benchmarks/stage_benchmark.py --scales 1 10 100 --save-baseline
+python benchmarks/stage_benchmark.py --scales 1 10 100 --tolerance 0.2   # exit 1 on regressions
+
+Results are written to benchmarks/results.json; --save-baseline also stores them as
+benchmarks/baseline.json, which later runs are compared against (same stage and scale).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PART_C = 'PartC- Semi-Structured Data Processing'
+PART_D = 'PartD- Unstructured Text Data Integration'
+HERE = os.path.join(REPO, 'benchmarks')
+
+# ru_maxrss is in kilobytes on linux but in bytes on macos
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def copy_tree(work):
+    """scripts and inputs of Part C / D into the scratch folder - outputs are never copied"""
+    ignore = shutil.ignore_patterns('outputs', '__pycache__', '*.pyc')
+    shutil.copytree(os.path.join(REPO, PART_C), os.path.join(work, PART_C), ignore=ignore)
+    shutil.copytree(os.path.join(REPO, PART_D), os.path.join(work, PART_D), ignore=ignore)
+
+
+def scale_json_fixtures(part_c, scale):
+    """repeat the recorded api responses `scale` times (ids renumbered so rows stay unique) as replay archives"""
+    for name, id_key in [('users', 'id'), ('posts', 'id'), ('countries', None)]:
+        path = os.path.join(REPO, PART_C, 'data', 'json', f'{name}_raw.json')
+        with open(path) as f:
+            records = json.load(f)
+        n = max(1, int(round(len(records) * scale)))
+        scaled = []
+        for i in range(n):
+            rec = dict(records[i % len(records)])
+            if id_key:
+                rec[id_key] = i + 1
+            scaled.append(rec)
+        with gzip.open(os.path.join(part_c, 'data', 'json', f'{name}_raw.jsonl.gz'), 'wt', encoding='utf-8') as f:
+            f.writelines(json.dumps(rec) + '\n' for rec in scaled)
+
+
+def scale_scraped_text(part_d, scale):
+    """tile the committed scraped_text_data.csv to `scale` times its size for the Part D integration"""
+    text = pd.read_csv(os.path.join(REPO, PART_D, 'outputs', 'text', 'scraped_text_data.csv'))
+    n = max(1, int(round(len(text) * scale)))
+    tiled = text.iloc[[i % len(text) for i in range(n)]].reset_index(drop=True)
+    # make the titles unique again so the duplicate checks see what a bigger scrape would look like
+    tiled['title'] = tiled['title'] + (tiled.index // len(text)).map(lambda k: f' ({k})' if k else '')
+    os.makedirs(os.path.join(part_d, 'outputs', 'text'), exist_ok=True)
+    tiled.to_csv(os.path.join(part_d, 'outputs', 'text', 'scraped_text_data.csv'), index=False)
+
+
+def prepare(work, scale, seed):
+    """copy the repo and build inputs for one scale (not timed)"""
+    copy_tree(work)
+    part_c = os.path.join(work, PART_C)
+    subprocess.run([sys.executable, 'generate_sample_data.py', '--scale', str(scale), '--seed', str(seed)],
+                   cwd=part_c, check=True, stdout=subprocess.DEVNULL)
+    scale_json_fixtures(part_c, scale)
+    scale_scraped_text(os.path.join(work, PART_D), scale)
+
+
+# rows each stage handled - read back from the summaries the stages write anyway
+def csv_rows(folder):
+    return int(pd.read_csv(os.path.join(folder, 'outputs', 'csv_processing_summary.csv'))['rows'].sum())
+
+
+def json_rows(folder):
+    return int(pd.read_csv(os.path.join(folder, 'outputs', 'json_summary.csv'))['records'].sum())
+
+
+def xml_rows(folder):
+    return int(pd.read_csv(os.path.join(folder, 'outputs', 'xml_processing_summary.csv'))['records'].sum())
+
+
+def catalog_rows(folder):
+    return int(pd.read_csv(os.path.join(folder, 'outputs', 'master_data_catalog.csv'))['records'].sum())
+
+
+def text_rows(folder):
+    return int(pd.read_csv(os.path.join(folder, 'outputs', 'integrated', 'quality_report.csv'))['total_documents'].sum())
+
+
+# in run order - final_integration reads what the three Part C stages wrote
+STAGES = [
+    ('csv', PART_C, ['csv_processing.py'], csv_rows),
+    ('json', PART_C, ['json_processing.py', '--from-raw'], json_rows),
+    ('xml', PART_C, ['xml_processing.py'], xml_rows),
+    ('final_integration', PART_C, ['final_integration.py'], catalog_rows),
+    ('text_integration', PART_D, ['data_integration_pipeline.py'], text_rows),
+]
+
+
+def run_stage(cmd, cwd, log_path):
+    """run one script, returns (wall seconds, peak rss in MB) of that process"""
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONDONTWRITEBYTECODE='1')
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable] + cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives the resource usage of exactly this child
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed (exit {proc.returncode}), see {log_path}")
+    return seconds, usage.ru_maxrss * RSS_UNIT / 1024 / 1024
+
+
+def benchmark_scale(scale, seed, repeat, keep):
+    work = tempfile.mkdtemp(prefix=f'stage-bench-{scale:g}-')
+    print(f"\nscale {scale:g}: preparing inputs in {work}")
+    results = []
+    try:
+        prepare(work, scale, seed)
+        for name, part, cmd, count_rows in STAGES:
+            cwd = os.path.join(work, part)
+            runs = []
+            for i in range(repeat):
+                runs.append(run_stage(cmd, cwd, os.path.join(work, f'{name}-{i}.log')))
+            # best of the repeats - the slower ones are mostly noise from other processes
+            seconds = min(r[0] for r in runs)
+            rss = max(r[1] for r in runs)
+            rows = count_rows(cwd)
+            results.append({
+                'stage': name,
+                'scale': scale,
+                'rows': rows,
+                'seconds': round(seconds, 3),
+                'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None,
+                'peak_rss_mb': round(rss, 1),
+            })
+            print(f"  {name:<18} {rows:>10,} rows  {seconds:8.2f}s  {rss:8.1f} MB")
+    finally:
+        if keep:
+            print(f"  kept {work}")
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """rows where the new run is slower (or needs more memory) than the baseline by more than tolerance"""
+    base = {(r['stage'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = base.get((r['stage'], r['scale']))
+        if old is None:
+            continue
+        for key in ['seconds', 'peak_rss_mb']:
+            if old[key] and r[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{r['stage']} @ scale {r['scale']:g}: {key} {old[key]} -> {r[key]} "
+                                   f"(+{(r[key] / old[key] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Part C / D stages at several input scales')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                        help='input scale factors (1 = the sample data sizes), default 1 10 100')
+    parser.add_argument('--seed', type=int, default=42, help='seed for the generated data')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage, the fastest one counts')
+    parser.add_argument('--output', default=os.path.join(HERE, 'results.json'), help='where to write the results')
+    parser.add_argument('--baseline', default=os.path.join(HERE, 'baseline.json'), help='baseline file to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown / memory growth against the baseline (default 0.2 = 20%%)')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch folders (logs, outputs)')
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        results += benchmark_scale(scale, args.seed, args.repeat, args.keep)
+
+    run = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(run, f, indent=2)
+
+    print("\n--- Results ---")
+    print(pd.DataFrame(results).to_string(index=False))
+    print(f"\nsaved to {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"saved as baseline {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline yet - run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    print(f"\ncompared with baseline from {baseline['created']} ({baseline['machine']})")
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for r in regressions:
+            print(f"  - {r}")
+        return 1
+    print(f"no regressions over {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())